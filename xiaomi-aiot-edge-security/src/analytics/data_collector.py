@@ -15,12 +15,13 @@ from typing import Dict, List, Any, Optional
 class DataCollector:
     """数据收集器，负责收集和存储边缘设备的性能及安全数据"""
     
-    def __init__(self, config_path: str = "../config/analytics.yaml"):
+    def __init__(self, config_path: str = "../config/analytics.yaml", thread_factory=Thread):
         """
         初始化数据收集器
         
         Args:
             config_path: 分析配置文件路径
+            thread_factory: 创建收集线程的可调用对象，默认为threading.Thread
         """
         self.logger = logging.getLogger("analytics.data_collector")
         self.config = self._load_config(config_path)
@@ -38,6 +39,7 @@ class DataCollector:
         }
         
         self.collector_thread = None
+        self._thread_factory = thread_factory
         self.stop_event = Event()
         self.device_connectors = {}  # 存储设备连接器
     
@@ -77,8 +79,7 @@ class DataCollector:
             return
             
         self.stop_event.clear()
-        self.collector_thread = Thread(target=self._collection_loop)
-        self.collector_thread.daemon = True
+        self.collector_thread = self._thread_factory(target=self._collection_loop, daemon=True)
         self.collector_thread.start()
         self.logger.info("数据收集器已启动")
     
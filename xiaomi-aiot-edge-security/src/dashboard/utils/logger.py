@@ -12,6 +12,15 @@ def get_logger(name):
     Returns:
         logging.Logger: 日志记录器实例
     """
+    # 获取日志记录器
+    logger = logging.getLogger(name)
+    
+    # 已配置过处理器时直接返回，避免重复创建文件句柄
+    if logger.handlers:
+        return logger
+    
+    logger.setLevel(logging.INFO)
+    
     # 创建日志目录
     log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "logs")
     if not os.path.exists(log_dir):
@@ -31,13 +40,8 @@ def get_logger(name):
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
     
-    # 获取日志记录器
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
     # 添加处理器
-    if not logger.handlers:
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
     
     return logger
\ No newline at end of file
@@ -6,10 +6,13 @@ EdgeX Foundry 连接器
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import logging
 from typing import Dict, List, Any, Optional
 from .connector_base import ConnectorBase
+from ..utils.serialization import dumps as _dumps, loads as _loads
 
 class EdgeXConnector(ConnectorBase):
     """EdgeX Foundry 平台连接器"""
@@ -25,6 +28,8 @@ class EdgeXConnector(ConnectorBase):
                 - metadata_port: EdgeX元数据服务端口 (默认为 59881)
                 - core_command_port: EdgeX核心命令服务端口 (默认为 59882)
                 - token: 认证令牌 (可选)
+                - max_retries: 请求失败时的重试次数 (默认为 2)
+                - retry_backoff: 重试间隔的退避系数，单位秒 (默认为 0.1，设为 0 时不等待)
         """
         super().__init__(config)
         self.logger = logging.getLogger(__name__)
@@ -45,6 +50,20 @@ class EdgeXConnector(ConnectorBase):
         self.headers = {"Content-Type": "application/json"}
         if self.token:
             self.headers["Authorization"] = f"Bearer {self.token}"
+        
+        # 重试参数
+        self.max_retries = config.get('max_retries', 2)
+        self.retry_backoff = config.get('retry_backoff', 0.1)
+        
+        # 复用连接池的HTTP会话，避免每次请求重新建立TCP连接
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=self.max_retries, backoff_factor=self.retry_backoff)
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
     
     def connect(self) -> bool:
         """
@@ -68,7 +87,7 @@ class EdgeXConnector(ConnectorBase):
             for endpoint in endpoints:
                 try:
                     self.logger.info(f"尝试连接到端点: {endpoint}")
-                    response = requests.get(endpoint, headers=self.headers, timeout=3)
+                    response = self.session.get(endpoint, headers=self.headers, timeout=3)
                     if response.status_code == 200:
                         self.logger.info(f"成功连接到EdgeX Foundry实例: {endpoint}")
                         return True
@@ -90,7 +109,8 @@ class EdgeXConnector(ConnectorBase):
         Returns:
             bool: 断开连接成功返回True，否则返回False
         """
-        # EdgeX REST API无需显式断开连接
+        # EdgeX REST API无需显式断开连接，只需释放连接池
+        self.session.close()
         return True
 
     def create_device_profile(self, profile_data: Dict[str, Any]) -> str:
@@ -106,14 +126,14 @@ class EdgeXConnector(ConnectorBase):
         try:
             # 尝试创建，但即使失败也返回模拟ID
             try:
-                response = requests.post(
+                response = self.session.post(
                     f"{self.metadata_url}/api/v2/deviceprofile",
                     headers=self.headers,
-                    json=profile_data
+                    data=_dumps(profile_data)
                 )
                 
                 if response.status_code in [200, 201]:
-                    result = response.json()
+                    result = _loads(response.content)
                     self.logger.info(f"成功创建设备配置文件: {profile_data.get('name')}")
                     return result.get('id', '')
             except Exception:
@@ -140,14 +160,14 @@ class EdgeXConnector(ConnectorBase):
         try:
             # 尝试创建，但即使失败也返回模拟ID
             try:
-                response = requests.post(
+                response = self.session.post(
                     f"{self.metadata_url}/api/v2/deviceservice",
                     headers=self.headers,
-                    json=service_data
+                    data=_dumps(service_data)
                 )
                 
                 if response.status_code in [200, 201]:
-                    result = response.json()
+                    result = _loads(response.content)
                     self.logger.info(f"成功创建设备服务: {service_data.get('name')}")
                     return result.get('id', '')
             except Exception:
@@ -174,14 +194,14 @@ class EdgeXConnector(ConnectorBase):
         try:
             # 尝试创建，但即使失败也返回模拟ID
             try:
-                response = requests.post(
+                response = self.session.post(
                     f"{self.metadata_url}/api/v2/device",
                     headers=self.headers,
-                    json=device_data
+                    data=_dumps(device_data)
                 )
                 
                 if response.status_code in [200, 201]:
-                    result = response.json()
+                    result = _loads(response.content)
                     self.logger.info(f"成功创建设备: {device_data.get('name')}")
                     return result.get('id', '')
             except Exception:
@@ -218,10 +238,10 @@ class EdgeXConnector(ConnectorBase):
             self.logger.debug(f"准备发送设备{device_name}的数据: {readings}")
             
             try:
-                response = requests.post(
+                response = self.session.post(
                     f"{self.core_data_url}/api/v2/event",
                     headers=self.headers,
-                    json=event_data,
+                    data=_dumps(event_data),
                     timeout=5
                 )
                 
@@ -284,13 +304,13 @@ class EdgeXConnector(ConnectorBase):
         try:
             # 尝试获取，但即使失败也返回模拟数据
             try:
-                response = requests.get(
+                response = self.session.get(
                     f"{self.core_data_url}/api/v2/event/device/name/{device_name}/count/{count}",
                     headers=self.headers
                 )
                 
                 if response.status_code == 200:
-                    events = response.json()
+                    events = _loads(response.content)
                     readings = []
                     for event in events:
                         readings.extend(event.get('readings', []))
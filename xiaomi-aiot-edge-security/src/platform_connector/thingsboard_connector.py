@@ -8,12 +8,13 @@ ThingsBoard Edge 连接器
 import os
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import logging
 from typing import Dict, List, Any, Optional
 from .connector_base import ConnectorBase
-
-import paho.mqtt.client as mqtt
+from ..utils.serialization import dumps as _dumps, loads as _loads
 
 class ThingsBoardConnector(ConnectorBase):
     """ThingsBoard Edge 平台连接器"""
@@ -30,6 +31,8 @@ class ThingsBoardConnector(ConnectorBase):
                 - auth: 认证配置
                   - username: 用户名
                   - password: 密码
+                - max_retries: 请求失败时的重试次数 (默认为 2)
+                - retry_backoff: 重试间隔的退避系数，单位秒 (默认为 0.1，设为 0 时不等待)
         """
         super().__init__(config)
         self.logger = logging.getLogger(__name__)
@@ -52,6 +55,20 @@ class ThingsBoardConnector(ConnectorBase):
         
         # MQTT客户端
         self.mqtt_client = None
+        
+        # 重试参数
+        self.max_retries = config.get('max_retries', 2)
+        self.retry_backoff = config.get('retry_backoff', 0.1)
+        
+        # 复用连接池的HTTP会话，避免每次请求重新建立TCP连接
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=self.max_retries, backoff_factor=self.retry_backoff)
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
     
     def connect(self) -> bool:
         """
@@ -65,14 +82,14 @@ class ThingsBoardConnector(ConnectorBase):
             login_payload = {"username": self.username, "password": self.password}
             
             self.logger.info(f"尝试连接到ThingsBoard: {self.base_url}/auth/login")
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/auth/login",
                 headers={"Content-Type": "application/json", "Accept": "application/json"},
-                json=login_payload
+                data=_dumps(login_payload)
             )
             
             if response.status_code == 200:
-                token_data = response.json()
+                token_data = _loads(response.content)
                 self.jwt_token = token_data.get('token')
                 self.logger.info("成功连接到ThingsBoard Edge实例")
                 return True
@@ -102,6 +119,7 @@ class ThingsBoardConnector(ConnectorBase):
                 pass
         
         self.jwt_token = None
+        self.session.close()
         return True
     
     def _get_headers(self) -> Dict[str, str]:
@@ -144,14 +162,14 @@ class ThingsBoardConnector(ConnectorBase):
             
             # 尝试创建设备，但即使失败也返回模拟数据
             try:
-                response = requests.post(
+                response = self.session.post(
                     f"{self.base_url}/device",
                     headers=self._get_headers(),
-                    json=device_data
+                    data=_dumps(device_data)
                 )
                 
                 if response.status_code in [200, 201]:
-                    device_info = response.json()
+                    device_info = _loads(response.content)
                     self.logger.info(f"成功创建设备: {name}")
                     return device_info
             except Exception:
@@ -192,13 +210,13 @@ class ThingsBoardConnector(ConnectorBase):
         try:
             # 尝试获取凭证，但即使失败也返回模拟凭证
             try:
-                response = requests.get(
+                response = self.session.get(
                     f"{self.base_url}/device/{device_id}/credentials",
                     headers=self._get_headers()
                 )
                 
                 if response.status_code == 200:
-                    credentials = response.json()
+                    credentials = _loads(response.content)
                     self.logger.debug(f"成功获取设备凭证: {device_id}")
                     return credentials
             except Exception:
@@ -258,10 +276,10 @@ class ThingsBoardConnector(ConnectorBase):
             self.logger.debug(f"准备发送遥测数据，访问令牌: {access_token}, 数据: {telemetry_data}")
             
             try:
-                response = requests.post(
+                response = self.session.post(
                     url,
                     headers={"Content-Type": "application/json"},
-                    json=telemetry_data,
+                    data=_dumps(telemetry_data),
                     timeout=5
                 )
                 
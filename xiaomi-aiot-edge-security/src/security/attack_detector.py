@@ -15,17 +15,19 @@ import queue
 class AttackDetector:
     """攻击检测器，负责检测多种类型的攻击"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], thread_factory=threading.Thread):
         """
         初始化攻击检测器
         
         Args:
             config: 检测器配置
+            thread_factory: 创建检测线程的可调用对象，默认为threading.Thread
         """
         self.logger = logging.getLogger(__name__)
         self.config = config
         self.running = False
         self.detector_thread = None
+        self._thread_factory = thread_factory
         self.detection_queue = queue.Queue()
         self.detection_interval = 1.0  # 检测间隔（秒）
         
@@ -38,6 +40,13 @@ class AttackDetector:
             'anomaly'       # 异常行为
         ]
         
+        # 攻击类型到检测方法的映射，初始化时构建一次，检测循环中直接按类型取用
+        self.detectors_by_type = {
+            attack_type: getattr(self, f"_detect_{attack_type}_attack")
+            for attack_type in self.attack_types
+            if hasattr(self, f"_detect_{attack_type}_attack")
+        }
+        
         # 攻击检测回调函数
         self.on_attack_detected = None
         
@@ -50,8 +59,7 @@ class AttackDetector:
             return
         
         self.running = True
-        self.detector_thread = threading.Thread(target=self._detection_loop)
-        self.detector_thread.daemon = True
+        self.detector_thread = self._thread_factory(target=self._detection_loop, daemon=True)
         self.detector_thread.start()
         self.logger.info("攻击检测器已启动")
     
@@ -86,18 +94,15 @@ class AttackDetector:
         while self.running:
             try:
                 # 执行各种攻击检测
-                for attack_type in self.attack_types:
+                for attack_type, detect_method in self.detectors_by_type.items():
                     if not self.running:
                         break
                         
                     try:
-                        method_name = f"_detect_{attack_type}_attack"
-                        if hasattr(self, method_name):
-                            detect_method = getattr(self, method_name)
-                            attack_detected = detect_method()
-                            
-                            if attack_detected and self.on_attack_detected:
-                                self.on_attack_detected(attack_detected)
+                        attack_detected = detect_method()
+                        
+                        if attack_detected and self.on_attack_detected:
+                            self.on_attack_detected(attack_detected)
                     except Exception as e:
                         self.logger.error(f"检测器 {attack_type} 执行异常: {str(e)}")
                 
@@ -13,12 +13,13 @@ from typing import List, Dict, Any
 class ProtectionEngine:
     """安全防护引擎，负责执行防护操作"""
     
-    def __init__(self, config_path: str = "../config/security.yaml"):
+    def __init__(self, config_path: str = "../config/security.yaml", thread_factory=Thread):
         """
         初始化防护引擎
         
         Args:
             config_path: 安全配置文件路径
+            thread_factory: 创建防护线程的可调用对象，默认为threading.Thread
         """
         self.logger = logging.getLogger("security.protection_engine")
         self.config = self._load_config(config_path)
@@ -26,6 +27,7 @@ class ProtectionEngine:
         self.active_protections = {}
         self.stop_event = Event()
         self.protection_thread = None
+        self._thread_factory = thread_factory
         self.load_protection_rules()
         
     def _load_config(self, config_path: str) -> Dict:
@@ -88,8 +90,7 @@ class ProtectionEngine:
             return
             
         self.stop_event.clear()
-        self.protection_thread = Thread(target=self._protection_loop)
-        self.protection_thread.daemon = True
+        self.protection_thread = self._thread_factory(target=self._protection_loop, daemon=True)
         self.protection_thread.start()
         self.logger.info("防护引擎已启动")
         
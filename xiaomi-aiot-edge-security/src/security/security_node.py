@@ -8,7 +8,6 @@
 import logging
 import threading
 import time
-import json
 import uuid
 import socket
 import hashlib
@@ -17,6 +16,7 @@ import zmq
 from .attack_detector import AttackDetector
 from .protection_engine import ProtectionEngine
 from .security_logger import SecurityLogger
+from ..utils.serialization import dumps as _dumps, loads as _loads
 
 class SecurityNode:
     """安全节点类，表示分布式安全框架中的一个节点"""
@@ -242,13 +242,13 @@ class SecurityNode:
                         "discovery_port": self.discovery_port,
                         "timestamp": time.time()
                     }
-                    self.discovery_socket.send_string(json.dumps(network_info))
+                    self.discovery_socket.send(_dumps(network_info))
                     self._stop_event.wait(10.0)  # 每10秒广播一次
                 else:
                     # 工作节点处理发现消息
                     try:
-                        message = self.discovery_socket.recv_string(flags=zmq.NOBLOCK)
-                        data = json.loads(message)
+                        message = self.discovery_socket.recv(flags=zmq.NOBLOCK)
+                        data = _loads(message)
                         if data.get("type") == "network_info":
                             coordinator_id = data.get("coordinator_id")
                             if coordinator_id and coordinator_id not in self.known_nodes:
@@ -275,7 +275,7 @@ class SecurityNode:
                         frames = self.message_socket.recv_multipart(flags=zmq.NOBLOCK)
                         if len(frames) >= 3:  # [sender_id, empty, message]
                             sender_id = frames[0].decode("utf-8")
-                            message_data = json.loads(frames[2].decode("utf-8"))
+                            message_data = _loads(frames[2])
                             self._process_message(sender_id, message_data)
                     except zmq.Again:
                         pass  # 没有消息，继续
@@ -284,7 +284,7 @@ class SecurityNode:
                     try:
                         frames = self.message_socket.recv_multipart(flags=zmq.NOBLOCK)
                         if len(frames) >= 2:  # [empty, message]
-                            message_data = json.loads(frames[1].decode("utf-8"))
+                            message_data = _loads(frames[1])
                             self._process_message("coordinator", message_data)
                     except zmq.Again:
                         pass  # 没有消息，继续
@@ -308,6 +308,7 @@ class SecurityNode:
                     "timestamp": time.time()
                 }
                 
+                payload = _dumps(heartbeat_message)
                 if self.node_type == "coordinator":
                     # 协调器向所有工作节点广播心跳
                     for node_id in list(self.known_nodes.keys()):
@@ -315,7 +316,7 @@ class SecurityNode:
                             self.message_socket.send_multipart([
                                 node_id.encode("utf-8"),
                                 b"",
-                                json.dumps(heartbeat_message).encode("utf-8")
+                                payload
                             ])
                         except Exception as e:
                             self.logger.warning(f"向节点 {node_id} 发送心跳失败: {str(e)}")
@@ -323,7 +324,7 @@ class SecurityNode:
                     # 工作节点向协调器发送心跳
                     self.message_socket.send_multipart([
                         b"",
-                        json.dumps(heartbeat_message).encode("utf-8")
+                        payload
                     ])
                 
                 # 更新自己的心跳时间
@@ -520,12 +521,12 @@ class SecurityNode:
                 self.message_socket.send_multipart([
                     sender_id.encode("utf-8"),
                     b"",
-                    json.dumps(response).encode("utf-8")
+                    _dumps(response)
                 ])
             else:
                 self.message_socket.send_multipart([
                     b"",
-                    json.dumps(response).encode("utf-8")
+                    _dumps(response)
                 ])
         except Exception as e:
             self.logger.error(f"处理命令消息时出错: {str(e)}")
@@ -556,16 +557,21 @@ class SecurityNode:
                     "timestamp": time.time()
                 }
                 
-                for other_node_id in list(self.known_nodes.keys()):
-                    if other_node_id != node_id:
-                        try:
-                            self.message_socket.send_multipart([
-                                other_node_id.encode("utf-8"),
-                                b"",
-                                json.dumps(offline_message).encode("utf-8")
-                            ])
-                        except Exception as e:
-                            self.logger.warning(f"通知节点 {other_node_id} 关于 {node_id} 离线状态失败: {str(e)}")
+                try:
+                    payload = _dumps(offline_message)
+                except Exception as e:
+                    self.logger.warning(f"序列化节点 {node_id} 离线消息失败: {str(e)}")
+                else:
+                    for other_node_id in list(self.known_nodes.keys()):
+                        if other_node_id != node_id:
+                            try:
+                                self.message_socket.send_multipart([
+                                    other_node_id.encode("utf-8"),
+                                    b"",
+                                    payload
+                                ])
+                            except Exception as e:
+                                self.logger.warning(f"通知节点 {other_node_id} 关于 {node_id} 离线状态失败: {str(e)}")
             
             # 从已知节点中移除
             del self.known_nodes[node_id]
@@ -596,6 +602,12 @@ class SecurityNode:
             "timestamp": time.time()
         }
         
+        try:
+            payload = _dumps(alert_message)
+        except Exception as e:
+            self.logger.warning(f"序列化告警消息失败: {str(e)}")
+            return
+        
         if self.node_type == "coordinator":
             # 广播给所有工作节点
             for node_id in self.known_nodes:
@@ -603,7 +615,7 @@ class SecurityNode:
                     self.message_socket.send_multipart([
                         node_id.encode("utf-8"),
                         b"",
-                        json.dumps(alert_message).encode("utf-8")
+                        payload
                     ])
                 except Exception as e:
                     self.logger.warning(f"向节点 {node_id} 发送告警失败: {str(e)}")
@@ -611,7 +623,7 @@ class SecurityNode:
             # 发送给协调器
             self.message_socket.send_multipart([
                 b"",
-                json.dumps(alert_message).encode("utf-8")
+                payload
             ])
     
     def _broadcast_alert(self, alert_data: Dict[str, Any], skip_node_id: str = None):
@@ -634,13 +646,19 @@ class SecurityNode:
             "timestamp": time.time()
         }
         
+        try:
+            payload = _dumps(alert_message)
+        except Exception as e:
+            self.logger.warning(f"序列化告警消息失败: {str(e)}")
+            return
+        
         for node_id in list(self.known_nodes.keys()):
             if node_id != skip_node_id:
                 try:
                     self.message_socket.send_multipart([
                         node_id.encode("utf-8"),
                         b"",
-                        json.dumps(alert_message).encode("utf-8")
+                        payload
                     ])
                 except Exception as e:
                     self.logger.warning(f"向节点 {node_id} 广播告警失败: {str(e)}")
@@ -665,13 +683,19 @@ class SecurityNode:
             "timestamp": time.time()
         }
         
+        try:
+            payload = _dumps(policy_message)
+        except Exception as e:
+            self.logger.warning(f"序列化策略更新消息失败: {str(e)}")
+            return
+        
         for node_id in list(self.known_nodes.keys()):
             if node_id != skip_node_id:
                 try:
                     self.message_socket.send_multipart([
                         node_id.encode("utf-8"),
                         b"",
-                        json.dumps(policy_message).encode("utf-8")
+                        payload
                     ])
                 except Exception as e:
                     self.logger.warning(f"向节点 {node_id} 广播策略更新失败: {str(e)}")
@@ -703,13 +727,19 @@ class SecurityNode:
             "timestamp": time.time()
         }
         
+        try:
+            payload = _dumps(status_message)
+        except Exception as e:
+            self.logger.warning(f"序列化节点状态消息失败: {str(e)}")
+            return
+        
         for node_id in list(self.known_nodes.keys()):
             if node_id != skip_node_id:
                 try:
                     self.message_socket.send_multipart([
                         node_id.encode("utf-8"),
                         b"",
-                        json.dumps(status_message).encode("utf-8")
+                        payload
                     ])
                 except Exception as e:
                     self.logger.warning(f"向节点 {node_id} 广播节点状态失败: {str(e)}")
@@ -732,6 +762,11 @@ class SecurityNode:
             "timestamp": time.time()
         }
         
+        try:
+            payload = _dumps(status_message)
+        except Exception:
+            return  # 忽略错误
+        
         if self.node_type == "coordinator":
             # 广播给所有工作节点
             for node_id in list(self.known_nodes.keys()):
@@ -739,7 +774,7 @@ class SecurityNode:
                     self.message_socket.send_multipart([
                         node_id.encode("utf-8"),
                         b"",
-                        json.dumps(status_message).encode("utf-8")
+                        payload
                     ])
                 except Exception:
                     pass  # 忽略错误
@@ -748,7 +783,7 @@ class SecurityNode:
             try:
                 self.message_socket.send_multipart([
                     b"",
-                    json.dumps(status_message).encode("utf-8")
+                    payload
                 ])
             except Exception:
                 pass  # 忽略错误
\ No newline at end of file
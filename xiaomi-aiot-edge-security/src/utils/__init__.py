@@ -7,6 +7,7 @@
 
 from .config import ConfigManager, load_config
 from .logger import setup_logger, get_logger
+from .serialization import dumps, loads
 from .crypto import encrypt_data, decrypt_data, generate_key_pair, sign_data, verify_signature
 from .protocol import (
     ProtocolHandler, 
@@ -18,7 +19,8 @@ from .protocol import (
 
 __all__ = [
     'ConfigManager', 'load_config',
-    'setup_logging', 'get_logger',
+    'setup_logger', 'get_logger',
+    'dumps', 'loads',
     'encrypt_data', 'decrypt_data', 'generate_key_pair', 'sign_data', 'verify_signature',
     'ProtocolHandler', 'MQTTHandler', 'HTTPHandler', 'CoAPHandler', 'create_protocol_handler'
 ]
\ No newline at end of file
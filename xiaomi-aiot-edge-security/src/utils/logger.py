@@ -6,9 +6,14 @@
 """
 
 import os
+import queue
+import atexit
 import logging
 import logging.config
-from typing import Dict, Any, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Optional, Set
+
+__all__ = ['setup_logger', 'get_logger']
 
 # 默认日志配置
 DEFAULT_LOG_CONFIG = {
@@ -46,6 +51,43 @@ DEFAULT_LOG_CONFIG = {
 
 _logger_initialized = False
 _log_config = DEFAULT_LOG_CONFIG.copy()
+_queue_listener: Optional[QueueListener] = None
+_ensured_dirs: Set[str] = set()  # 已确认存在的日志目录
+
+def _start_queue_listener() -> None:
+    """
+    将根日志记录器的处理器移交给后台监听线程
+    
+    调用方只需把日志记录放入队列，格式化和文件写入由 QueueListener 线程完成
+    """
+    global _queue_listener
+    
+    root_logger = logging.getLogger()
+    handlers = [h for h in root_logger.handlers if not isinstance(h, QueueHandler)]
+    if not handlers:
+        return
+    
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(QueueHandler(log_queue))
+    
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+def _stop_queue_listener() -> None:
+    """停止后台日志监听线程，写出队列中剩余的日志并关闭处理器"""
+    global _queue_listener
+    
+    if _queue_listener is None:
+        return
+    
+    _queue_listener.stop()
+    for handler in _queue_listener.handlers:
+        handler.close()
+    _queue_listener = None
+
+atexit.register(_stop_queue_listener)
 
 def setup_logger(config: Optional[Dict[str, Any]] = None, level: int = logging.INFO) -> None:
     """
@@ -62,15 +104,20 @@ def setup_logger(config: Optional[Dict[str, Any]] = None, level: int = logging.I
         _log_config = config
     
     # 确保日志目录存在
-    log_dir = os.path.dirname(_log_config['handlers']['file']['filename'])
-    if not os.path.exists(log_dir):
+    log_dir = os.path.dirname(os.path.abspath(_log_config['handlers']['file']['filename']))
+    if log_dir not in _ensured_dirs:
         os.makedirs(log_dir, exist_ok=True)
+        _ensured_dirs.add(log_dir)
     
     # 更新根日志级别
     _log_config['root']['level'] = level
     
-    # 配置日志系统
+    # 重新配置前先停止旧的监听线程
+    _stop_queue_listener()
+    
+    # 配置日志系统，再将根处理器移到监听线程中
     logging.config.dictConfig(_log_config)
+    _start_queue_listener()
     
     _logger_initialized = True
 
@@ -95,9 +142,15 @@ def get_logger(name: str) -> logging.Logger:
     
     # 确保日志记录器具有正确的级别
     if _log_config and 'root' in _log_config and 'level' in _log_config['root']:
-        logger.setLevel(_log_config['root']['level'])
+        level = _log_config['root']['level']
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
     else:
         # 如果配置中没有根级别，则使用默认级别
-        logger.setLevel(logging.INFO)
+        level = logging.INFO
+    
+    # setLevel 会清空所有记录器的级别缓存，级别未变化时跳过
+    if logger.level != level:
+        logger.setLevel(level)
     
     return logger
\ No newline at end of file
@@ -12,18 +12,14 @@ import random
 from typing import Dict, Any, Optional, Callable, List
 from abc import ABC, abstractmethod
 
-# 配置日志记录器
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-
-# 获取日志记录器
+# 获取日志记录器，处理器由 setup_logger 统一配置在根记录器上
 logger = logging.getLogger(__name__)
 
 class ProtocolHandler(ABC):
     """协议处理器基类"""
 
+    __slots__ = ('config', 'connected')
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化协议处理器
@@ -98,6 +94,8 @@ class ProtocolHandler(ABC):
 class MQTTHandler(ProtocolHandler):
     """MQTT协议处理器"""
 
+    __slots__ = ('host', 'port', 'client_id', 'username', 'password', 'callbacks')
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化MQTT处理器
@@ -120,7 +118,7 @@ class MQTTHandler(ProtocolHandler):
     
     def connect(self) -> bool:
         """模拟连接到MQTT服务器"""
-        logger.info(f"连接MQTT服务器 {self.host}:{self.port}")
+        logger.info("连接MQTT服务器 %s:%s", self.host, self.port)
         # 这里只是模拟，实际应使用paho-mqtt等客户端连接
         self.connected = True
         return True
@@ -137,7 +135,7 @@ class MQTTHandler(ProtocolHandler):
             logger.error("未连接到MQTT服务器")
             return False
         
-        logger.info(f"发送消息到主题 {topic}: {payload}")
+        logger.info("发送消息到主题 %s: %s", topic, payload)
         return True
     
     def subscribe(self, topic: str, callback: Callable) -> bool:
@@ -146,8 +144,12 @@ class MQTTHandler(ProtocolHandler):
             logger.error("未连接到MQTT服务器")
             return False
         
+        if not callable(callback):
+            logger.error("订阅主题 %s 的回调不可调用", topic)
+            return False
+        
         self.callbacks[topic] = callback
-        logger.info(f"订阅主题: {topic}")
+        logger.info("订阅主题: %s", topic)
         return True
     
     def unsubscribe(self, topic: str) -> bool:
@@ -156,17 +158,18 @@ class MQTTHandler(ProtocolHandler):
             logger.error("未连接到MQTT服务器")
             return False
         
-        if topic in self.callbacks:
-            del self.callbacks[topic]
-            logger.info(f"取消订阅主题: {topic}")
+        if self.callbacks.pop(topic, None) is not None:
+            logger.info("取消订阅主题: %s", topic)
             return True
         
-        logger.warning(f"未找到主题订阅: {topic}")
+        logger.warning("未找到主题订阅: %s", topic)
         return False
 
 class HTTPHandler(ProtocolHandler):
     """HTTP协议处理器"""
 
+    __slots__ = ('base_url', 'headers', 'auth')
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化HTTP处理器
@@ -184,7 +187,7 @@ class HTTPHandler(ProtocolHandler):
     
     def connect(self) -> bool:
         """模拟HTTP连接"""
-        logger.info(f"初始化HTTP连接到 {self.base_url}")
+        logger.info("初始化HTTP连接到 %s", self.base_url)
         self.connected = True
         return True
     
@@ -200,8 +203,7 @@ class HTTPHandler(ProtocolHandler):
             logger.error("HTTP连接未初始化")
             return False
         
-        url = f"{self.base_url}/{topic}"
-        logger.info(f"发送HTTP请求到 {url}: {payload}")
+        logger.info("发送HTTP请求到 %s/%s: %s", self.base_url, topic, payload)
         return True
     
     def subscribe(self, topic: str, callback: Callable) -> bool:
@@ -217,6 +219,8 @@ class HTTPHandler(ProtocolHandler):
 class CoAPHandler(ProtocolHandler):
     """CoAP协议处理器"""
 
+    __slots__ = ('host', 'port', 'observers')
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化CoAP处理器
@@ -233,7 +237,7 @@ class CoAPHandler(ProtocolHandler):
     
     def connect(self) -> bool:
         """模拟CoAP连接"""
-        logger.info(f"初始化CoAP客户端，服务器: {self.host}:{self.port}")
+        logger.info("初始化CoAP客户端，服务器: %s:%s", self.host, self.port)
         self.connected = True
         return True
     
@@ -249,8 +253,7 @@ class CoAPHandler(ProtocolHandler):
             logger.error("CoAP客户端未初始化")
             return False
         
-        uri = f"coap://{self.host}:{self.port}/{topic}"
-        logger.info(f"发送CoAP请求到 {uri}: {payload}")
+        logger.info("发送CoAP请求到 coap://%s:%s/%s: %s", self.host, self.port, topic, payload)
         return True
     
     def subscribe(self, topic: str, callback: Callable) -> bool:
@@ -259,9 +262,13 @@ class CoAPHandler(ProtocolHandler):
             logger.error("CoAP客户端未初始化")
             return False
         
+        if not callable(callback):
+            logger.error("观察资源 %s 的回调不可调用", topic)
+            return False
+        
         self.observers[topic] = callback
         uri = f"coap://{self.host}:{self.port}/{topic}"
-        logger.info(f"观察CoAP资源: {uri}")
+        logger.info("观察CoAP资源: %s", uri)
         return True
     
     def unsubscribe(self, topic: str) -> bool:
@@ -270,13 +277,12 @@ class CoAPHandler(ProtocolHandler):
             logger.error("CoAP客户端未初始化")
             return False
         
-        if topic in self.observers:
-            del self.observers[topic]
+        if self.observers.pop(topic, None) is not None:
             uri = f"coap://{self.host}:{self.port}/{topic}"
-            logger.info(f"取消观察CoAP资源: {uri}")
+            logger.info("取消观察CoAP资源: %s", uri)
             return True
         
-        logger.warning(f"未找到CoAP资源观察: {topic}")
+        logger.warning("未找到CoAP资源观察: %s", topic)
         return False
 
 def create_protocol_handler(protocol_type: str, config: Dict[str, Any]) -> Optional[ProtocolHandler]:
@@ -299,5 +305,5 @@ def create_protocol_handler(protocol_type: str, config: Dict[str, Any]) -> Optio
     elif protocol_type == 'coap':
         return CoAPHandler(config)
     else:
-        logger.error(f"不支持的协议类型: {protocol_type}")
+        logger.error("不支持的协议类型: %s", protocol_type)
         return None
\ No newline at end of file
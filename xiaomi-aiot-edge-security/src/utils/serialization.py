@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON序列化工具模块
+优先使用 orjson 直接在 bytes 上序列化/解析，未安装时退回标准库
+"""
+
+import json
+from typing import Any
+
+__all__ = ['dumps', 'loads']
+
+try:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        """将对象序列化为JSON字节串"""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+except ImportError:
+    def dumps(obj: Any) -> bytes:
+        """将对象序列化为JSON字节串"""
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
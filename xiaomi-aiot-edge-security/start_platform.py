@@ -3,6 +3,7 @@
 
 import os
 import sys
+import runpy
 import logging
 import traceback
 
@@ -27,12 +28,13 @@ def setup_environment():
     
     for directory in dirs_to_create:
         dir_path = os.path.join(project_root, directory)
-        if not os.path.exists(dir_path):
-            try:
-                os.makedirs(dir_path)
-                print(f"创建目录: {dir_path}")
-            except Exception as e:
-                print(f"警告: 无法创建目录 {dir_path}: {e}")
+        try:
+            os.makedirs(dir_path)
+            print(f"创建目录: {dir_path}")
+        except FileExistsError:
+            pass
+        except Exception as e:
+            print(f"警告: 无法创建目录 {dir_path}: {e}")
     
     # 设置基本日志配置
     log_file = os.path.join(project_root, "logs", "platform.log")
@@ -56,22 +58,8 @@ def main():
         print(f"Python 版本: {sys.version}")
         print(f"Python 路径: {sys.executable}")
         
-        # 如果需要转发到其他脚本，使用以下格式而不是导入
-        # 这样可以避免导入相关的问题
-        main_script = os.path.join(project_root, "src", "main.py")
-        
-        # 使用 exec 执行主脚本，避免导入问题
-        with open(main_script, 'r', encoding='utf-8') as f:
-            script_content = f.read()
-        
-        # 构建全局和局部命名空间
-        global_namespace = {
-            '__file__': main_script,
-            '__name__': '__main__'
-        }
-        
-        # 在项目根目录的上下文中执行脚本
-        exec(script_content, global_namespace)
+        # 以模块方式运行主程序，导入系统会复用 src/__pycache__ 中的字节码
+        runpy.run_module("src.main", run_name="__main__", alter_sys=True)
         
     except Exception as e:
         print(f"错误: 运行程序时出现异常: {str(e)}")
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试辅助模块
+提供多个测试模块共用的替身对象
+"""
+
+
+class FakeThread:
+    """记录是否启动、但不真正运行目标函数的线程替身"""
+    
+    def __init__(self, target=None, **kwargs):
+        self.target = target
+        self.started = False
+    
+    def start(self):
+        self.started = True
+    
+    def is_alive(self):
+        return self.started
+    
+    def join(self, *args, **kwargs):
+        self.started = False
@@ -8,27 +8,63 @@
 import os
 import sys
 import unittest
-import json
 import time
 import datetime
 import tempfile
+import shutil
 from unittest.mock import MagicMock, patch, Mock
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
+import yaml
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# 报告模板目录，基于本文件位置解析，不依赖当前工作目录（便于 pytest -n 并行运行）
+TEMPLATES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'analytics', 'report_templates'))
+
+# 样本数据目录
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
 from src.analytics.data_collector import DataCollector
 from src.analytics.statistical_analyzer import StatisticalAnalyzer
 from src.analytics.report_generator import ReportGenerator
 from src.utils.config import load_config
+from tests.helpers import FakeThread
+
+
+def _load_samples(name, base_ts):
+    """加载tests/fixtures下的样本数据，时间戳以相对base_ts的毫秒偏移存储"""
+    df = pd.read_json(os.path.join(SAMPLES_DIR, f"{name}.jsonl"), lines=True, convert_dates=False)
+    df["timestamp"] += base_ts
+    return df
+
+
+class _StubReportGenerator(ReportGenerator):
+    """使用固定模板的报告生成器，记录模板加载和填充的调用次数"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._load_template_calls = 0
+        self._fill_template_calls = 0
+    
+    def _load_template(self, *args, **kwargs):
+        self._load_template_calls += 1
+        return "<html>{{ content }}</html>"
+    
+    def _fill_template(self, *args, **kwargs):
+        self._fill_template_calls += 1
+        return "<html>Report content</html>"
 
 
 class TestDataCollector(unittest.TestCase):
     """测试数据收集器"""
     
+    @classmethod
+    def setUpClass(cls):
+        """在所有测试之前设置"""
+        # 数据文件名中的日期
+        cls.date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+    
     def setUp(self):
         """在每个测试之前设置"""
         # 创建一个临时数据目录
@@ -54,12 +90,7 @@ class TestDataCollector(unittest.TestCase):
     
     def tearDown(self):
         """在每个测试之后清理"""
-        # 删除临时目录中的所有文件
-        for root, dirs, files in os.walk(self.temp_dir):
-            for file in files:
-                os.remove(os.path.join(root, file))
-        # 删除临时目录
-        os.rmdir(self.temp_dir)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
     
     def test_init(self):
         """测试初始化"""
@@ -76,136 +107,98 @@ class TestDataCollector(unittest.TestCase):
     
     def test_start_stop_collection(self):
         """测试启动和停止数据收集"""
-        # 模拟线程
-        with patch('threading.Thread') as mock_thread:
-            mock_thread_instance = MagicMock()
-            mock_thread.return_value = mock_thread_instance
-            
-            # 测试启动收集
-            result = self.collector.start_collection()
-            self.assertTrue(result)
-            self.assertTrue(self.collector.collection_active)
-            
-            # 线程应该已启动
-            mock_thread_instance.start.assert_called_once()
-            
-            # 测试停止收集
-            result = self.collector.stop_collection()
-            self.assertTrue(result)
-            self.assertFalse(self.collector.collection_active)
-    
-    def test_collect_device_data(self):
-        """测试设备数据收集"""
-        # 模拟设备遥测数据
-        device_data = {
-            "device_id": "test-gateway",
-            "device_type": "gateway",
-            "timestamp": int(time.time() * 1000),
-            "data": {
-                "connected_devices": 5,
-                "data_throughput": 256.5,
-                "cpu_usage": 15.2,
-                "memory_usage": 256.7
-            }
-        }
-        
-        # 收集数据
-        result = self.collector.collect_device_data(device_data)
-        self.assertTrue(result)
-        
-        # 检查数据文件是否已创建
-        date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-        data_file = os.path.join(self.temp_dir, f"gateway_telemetry_{date_str}.json")
-        self.assertTrue(os.path.exists(data_file))
-        
-        # 检查文件内容
-        with open(data_file, "r") as f:
-            lines = f.readlines()
-            self.assertEqual(len(lines), 1)
-            
-            saved_data = json.loads(lines[0])
-            self.assertEqual(saved_data["device_id"], device_data["device_id"])
-            self.assertEqual(saved_data["data"], device_data["data"])
+        # 将配置写入临时配置文件，收集器从中读取 data_collector 部分
+        config_path = os.path.join(self.temp_dir, "analytics.yaml")
+        with open(config_path, "w", encoding="utf-8") as f:
+            yaml.safe_dump({"data_collector": self.config}, f)
+        
+        # 使用不真正启动线程的线程工厂
+        collector = DataCollector(config_path, thread_factory=FakeThread)
+        
+        # 测试启动收集
+        collector.start()
+        self.assertFalse(collector.stop_event.is_set())
+        
+        # 线程应该已启动，并运行收集循环
+        self.assertTrue(collector.collector_thread.started)
+        self.assertEqual(collector.collector_thread.target, collector._collection_loop)
+        
+        # 测试停止收集
+        collector.stop()
+        self.assertTrue(collector.stop_event.is_set())
+        self.assertFalse(collector.collector_thread.started)
     
-    def test_collect_security_data(self):
-        """测试安全数据收集"""
-        # 模拟安全威胁数据
-        security_data = {
-            "threat_id": "threat-1",
-            "type": "ddos",
-            "confidence": 85,
-            "source": "192.168.1.100",
-            "target": "192.168.1.1",
-            "timestamp": int(time.time() * 1000),
-            "details": {
-                "packet_count": 5000,
-                "duration": 30
-            }
-        }
-        
-        # 收集数据
-        result = self.collector.collect_security_data(security_data)
-        self.assertTrue(result)
-        
-        # 检查数据文件是否已创建
-        date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-        data_file = os.path.join(self.temp_dir, f"threat_logs_{date_str}.json")
-        self.assertTrue(os.path.exists(data_file))
-        
-        # 检查文件内容
-        with open(data_file, "r") as f:
-            lines = f.readlines()
-            self.assertEqual(len(lines), 1)
-            
-            saved_data = json.loads(lines[0])
-            self.assertEqual(saved_data["threat_id"], security_data["threat_id"])
-            self.assertEqual(saved_data["type"], security_data["type"])
-            self.assertEqual(saved_data["details"], security_data["details"])
-    
-    def test_collect_performance_data(self):
-        """测试性能数据收集"""
-        # 模拟系统性能数据
-        performance_data = {
-            "timestamp": int(time.time() * 1000),
-            "system": "edge-gateway",
-            "metrics": {
-                "cpu_utilization": 25.3,
-                "memory_usage": 512.4,
-                "disk_usage": 1024.5,
-                "network_throughput": 1500.6
-            }
-        }
-        
-        # 收集数据
-        result = self.collector.collect_performance_data(performance_data)
-        self.assertTrue(result)
-        
-        # 检查数据文件是否已创建
-        date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-        data_file = os.path.join(self.temp_dir, f"system_metrics_{date_str}.json")
-        self.assertTrue(os.path.exists(data_file))
+    def test_collect_data(self):
+        """测试设备、安全和性能数据收集"""
+        timestamp = int(time.time() * 1000)
         
-        # 检查文件内容
-        with open(data_file, "r") as f:
-            lines = f.readlines()
-            self.assertEqual(len(lines), 1)
-            
-            saved_data = json.loads(lines[0])
-            self.assertEqual(saved_data["system"], performance_data["system"])
-            self.assertEqual(saved_data["metrics"], performance_data["metrics"])
-
+        # (数据类型, 数据源名称, 模拟数据, 需要校验的字段)
+        cases = [
+            ("device", "gateway_telemetry", {
+                "device_id": "test-gateway",
+                "device_type": "gateway",
+                "timestamp": timestamp,
+                "data": {
+                    "connected_devices": 5,
+                    "data_throughput": 256.5,
+                    "cpu_usage": 15.2,
+                    "memory_usage": 256.7
+                }
+            }, ("device_id", "data")),
+            ("security", "threat_logs", {
+                "threat_id": "threat-1",
+                "type": "ddos",
+                "confidence": 85,
+                "source": "192.168.1.100",
+                "target": "192.168.1.1",
+                "timestamp": timestamp,
+                "details": {
+                    "packet_count": 5000,
+                    "duration": 30
+                }
+            }, ("threat_id", "type", "details")),
+            ("performance", "system_metrics", {
+                "timestamp": timestamp,
+                "system": "edge-gateway",
+                "metrics": {
+                    "cpu_utilization": 25.3,
+                    "memory_usage": 512.4,
+                    "disk_usage": 1024.5,
+                    "network_throughput": 1500.6
+                }
+            }, ("system", "metrics")),
+        ]
+        
+        for kind, source_name, data, checked_keys in cases:
+            with self.subTest(kind=kind):
+                # 收集数据
+                collect = getattr(self.collector, f"collect_{kind}_data")
+                self.assertTrue(collect(data))
+                
+                # 检查数据文件是否已创建
+                data_file = os.path.join(self.temp_dir, f"{source_name}_{self.date_str}.json")
+                self.assertTrue(os.path.exists(data_file))
+                
+                # 检查文件内容
+                df = pd.read_json(data_file, lines=True)
+                self.assertEqual(len(df), 1)
+                
+                saved_data = df.iloc[0].to_dict()
+                for key in checked_keys:
+                    self.assertEqual(saved_data[key], data[key])
 
 class TestStatisticalAnalyzer(unittest.TestCase):
     """测试统计分析器"""
     
-    def setUp(self):
-        """在每个测试之前设置"""
+    @classmethod
+    def setUpClass(cls):
+        """在所有测试之前设置，测试数据文件只生成一次"""
         # 创建一个临时数据目录
-        self.temp_dir = tempfile.mkdtemp()
+        cls.temp_dir = tempfile.mkdtemp()
         
         # 模拟配置
-        self.config = {
-            "data_dir": self.temp_dir,
+        cls.config = {
+            "data_dir": cls.temp_dir,
             "analysis": {
                 "time_window": "daily",
                 "metrics": ["cpu_usage", "memory_usage", "network_throughput", "attack_detection_rate"]
@@ -217,129 +210,56 @@ class TestStatisticalAnalyzer(unittest.TestCase):
             }
         }
         
-        # 创建统计分析器实例
-        self.analyzer = StatisticalAnalyzer(self.config)
+        # 创建测试数据文件，各测试只读使用
+        cls._create_test_data()
         
-        # 创建测试数据文件
-        self._create_test_data()
+        # 统计分析器初始化后不再修改自身状态，由各测试共享
+        cls.analyzer = StatisticalAnalyzer(cls.config)
     
-    def tearDown(self):
-        """在每个测试之后清理"""
-        # 删除临时目录中的所有文件
-        for root, dirs, files in os.walk(self.temp_dir):
-            for file in files:
-                os.remove(os.path.join(root, file))
-        # 删除临时目录
-        os.rmdir(self.temp_dir)
+    @classmethod
+    def tearDownClass(cls):
+        """在所有测试之后清理"""
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
     
-    def _create_test_data(self):
+    @classmethod
+    def _create_test_data(cls):
         """创建测试数据文件"""
-        # 设备遥测数据
         date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-        device_file = os.path.join(self.temp_dir, f"gateway_telemetry_{date_str}.json")
-        
-        with open(device_file, "w") as f:
-            for i in range(10):
-                data = {
-                    "device_id": "test-gateway",
-                    "device_type": "gateway",
-                    "timestamp": int(time.time() * 1000) - i * 60000,
-                    "data": {
-                        "connected_devices": 5 + i,
-                        "data_throughput": 256.5 + i * 10,
-                        "cpu_usage": 15.2 + i * 0.5,
-                        "memory_usage": 256.7 + i * 5
-                    }
-                }
-                f.write(json.dumps(data) + "\n")
+        base_ts = int(time.time() * 1000)
         
-        # 安全威胁数据
-        security_file = os.path.join(self.temp_dir, f"threat_logs_{date_str}.json")
-        
-        with open(security_file, "w") as f:
-            for i in range(5):
-                data = {
-                    "threat_id": f"threat-{i+1}",
-                    "type": "ddos" if i % 2 == 0 else "mitm",
-                    "confidence": 70 + i * 5,
-                    "source": f"192.168.1.{100+i}",
-                    "target": "192.168.1.1",
-                    "timestamp": int(time.time() * 1000) - i * 600000,
-                    "details": {
-                        "packet_count": 1000 * (i + 1),
-                        "duration": 10 * (i + 1)
-                    }
-                }
-                f.write(json.dumps(data) + "\n")
-        
-        # 系统性能数据
-        performance_file = os.path.join(self.temp_dir, f"system_metrics_{date_str}.json")
-        
-        with open(performance_file, "w") as f:
-            for i in range(8):
-                data = {
-                    "timestamp": int(time.time() * 1000) - i * 300000,
-                    "system": "edge-gateway",
-                    "metrics": {
-                        "cpu_utilization": 20.0 + i * 2,
-                        "memory_usage": 400.0 + i * 25,
-                        "disk_usage": 1000.0 + i * 50,
-                        "network_throughput": 1000.0 + i * 100
-                    }
-                }
-                f.write(json.dumps(data) + "\n")
+        # 设备遥测、安全威胁和系统性能数据
+        for name in ("gateway_telemetry", "threat_logs", "system_metrics"):
+            data_file = os.path.join(cls.temp_dir, f"{name}_{date_str}.json")
+            _load_samples(name, base_ts).to_json(data_file, orient="records", lines=True)
     
-    def test_load_device_data(self):
-        """测试加载设备数据"""
-        # 加载数据
-        df = self.analyzer.load_device_data()
-        
-        # 验证数据框
-        self.assertIsInstance(df, pd.DataFrame)
-        self.assertEqual(len(df), 10)
-        
-        # 检查列
-        self.assertIn("device_id", df.columns)
-        self.assertIn("device_type", df.columns)
-        self.assertIn("timestamp", df.columns)
-        self.assertIn("connected_devices", df.columns)
-        self.assertIn("data_throughput", df.columns)
-        self.assertIn("cpu_usage", df.columns)
-        self.assertIn("memory_usage", df.columns)
-    
-    def test_load_security_data(self):
-        """测试加载安全数据"""
-        # 加载数据
-        df = self.analyzer.load_security_data()
-        
-        # 验证数据框
-        self.assertIsInstance(df, pd.DataFrame)
-        self.assertEqual(len(df), 5)
-        
-        # 检查列
-        self.assertIn("threat_id", df.columns)
-        self.assertIn("type", df.columns)
-        self.assertIn("confidence", df.columns)
-        self.assertIn("source", df.columns)
-        self.assertIn("target", df.columns)
-        self.assertIn("timestamp", df.columns)
-    
-    def test_load_performance_data(self):
-        """测试加载性能数据"""
-        # 加载数据
-        df = self.analyzer.load_performance_data()
-        
-        # 验证数据框
-        self.assertIsInstance(df, pd.DataFrame)
-        self.assertEqual(len(df), 8)
-        
-        # 检查列
-        self.assertIn("timestamp", df.columns)
-        self.assertIn("system", df.columns)
-        self.assertIn("cpu_utilization", df.columns)
-        self.assertIn("memory_usage", df.columns)
-        self.assertIn("disk_usage", df.columns)
-        self.assertIn("network_throughput", df.columns)
+    def test_load_data(self):
+        """测试加载设备、安全和性能数据"""
+        # (加载方法, 期望行数, 期望包含的列)
+        cases = [
+            ("load_device_data", 10, (
+                "device_id", "device_type", "timestamp", "connected_devices",
+                "data_throughput", "cpu_usage", "memory_usage"
+            )),
+            ("load_security_data", 5, (
+                "threat_id", "type", "confidence", "source", "target", "timestamp"
+            )),
+            ("load_performance_data", 8, (
+                "timestamp", "system", "cpu_utilization", "memory_usage",
+                "disk_usage", "network_throughput"
+            )),
+        ]
+        
+        for loader, expected_rows, expected_columns in cases:
+            with self.subTest(loader=loader):
+                # 加载数据
+                df = getattr(self.analyzer, loader)()
+                
+                # 验证数据框
+                self.assertIsInstance(df, pd.DataFrame)
+                self.assertEqual(len(df), expected_rows)
+                
+                # 检查列，一次列出所有缺失的列
+                self.assertEqual(set(expected_columns).difference(df.columns), set())
     
     def test_analyze_device_performance(self):
         """测试设备性能分析"""
@@ -432,17 +352,18 @@ class TestStatisticalAnalyzer(unittest.TestCase):
 class TestReportGenerator(unittest.TestCase):
     """测试报告生成器"""
     
-    def setUp(self):
-        """在每个测试之前设置"""
+    @classmethod
+    def setUpClass(cls):
+        """在所有测试之前设置，报告生成器实例由各测试共享"""
         # 创建一个临时数据目录
-        self.temp_dir = tempfile.mkdtemp()
-        self.reports_dir = os.path.join(self.temp_dir, "reports")
-        os.makedirs(self.reports_dir, exist_ok=True)
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.reports_dir = os.path.join(cls.temp_dir, "reports")
+        os.makedirs(cls.reports_dir, exist_ok=True)
         
         # 模拟配置
-        self.config = {
-            "reports_dir": self.reports_dir,
-            "templates_dir": "../src/analytics/report_templates",
+        cls.config = {
+            "reports_dir": cls.reports_dir,
+            "templates_dir": TEMPLATES_DIR,
             "report_format": "html",
             "sections": [
                 "executive_summary",
@@ -454,7 +375,7 @@ class TestReportGenerator(unittest.TestCase):
         }
         
         # 创建模拟分析数据
-        self.analysis_data = {
+        cls.analysis_data = {
             "device_performance": {
                 "cpu_usage": {
                     "mean": 20.0,
@@ -504,28 +425,20 @@ class TestReportGenerator(unittest.TestCase):
         }
         
         # 创建报告生成器实例
-        self.generator = ReportGenerator(self.config)
+        cls.generator = _StubReportGenerator(cls.config)
     
-    def tearDown(self):
-        """在每个测试之后清理"""
-        # 删除临时目录中的所有文件
-        for root, dirs, files in os.walk(self.temp_dir):
-            for file in files:
-                os.remove(os.path.join(root, file))
-        # 删除临时目录及其子目录
-        for root, dirs, files in os.walk(self.temp_dir, topdown=False):
-            for dir_name in dirs:
-                os.rmdir(os.path.join(root, dir_name))
-        os.rmdir(self.temp_dir)
+    @classmethod
+    def tearDownClass(cls):
+        """在所有测试之后清理"""
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
     
-    @patch('src.analytics.report_generator.ReportGenerator._load_template')
-    @patch('src.analytics.report_generator.ReportGenerator._fill_template')
-    def test_generate_html_report(self, mock_fill_template, mock_load_template):
+    def setUp(self):
+        """在每个测试之前重置模板调用计数"""
+        self.generator._load_template_calls = 0
+        self.generator._fill_template_calls = 0
+    
+    def test_generate_html_report(self):
         """测试生成HTML报告"""
-        # 模拟模板加载和填充
-        mock_load_template.return_value = "<html>{{ content }}</html>"
-        mock_fill_template.return_value = "<html>Report content</html>"
-        
         # 生成报告
         report_file = self.generator.generate_report(
             title="测试报告",
@@ -535,22 +448,14 @@ class TestReportGenerator(unittest.TestCase):
         
         # 验证结果
         self.assertIsNotNone(report_file)
-        mock_load_template.assert_called()
-        mock_fill_template.assert_called()
+        self.assertGreater(self.generator._load_template_calls, 0)
+        self.assertGreater(self.generator._fill_template_calls, 0)
     
-    @patch('src.analytics.report_generator.ReportGenerator._load_template')
-    @patch('src.analytics.report_generator.ReportGenerator._fill_template')
-    def test_generate_pdf_report(self, mock_fill_template, mock_load_template):
+    def test_generate_pdf_report(self):
         """测试生成PDF报告"""
-        # 修改配置为PDF格式
-        self.generator.config["report_format"] = "pdf"
-        
-        # 模拟模板加载和填充
-        mock_load_template.return_value = "<html>{{ content }}</html>"
-        mock_fill_template.return_value = "<html>Report content</html>"
-        
-        # 模拟PDF转换
-        with patch('weasyprint.HTML') as mock_weasyprint:
+        # 临时修改共享实例的配置为PDF格式，并模拟PDF转换
+        with patch.dict(self.generator.config, {"report_format": "pdf"}), \
+             patch('weasyprint.HTML') as mock_weasyprint:
             mock_weasyprint_instance = MagicMock()
             mock_weasyprint.return_value = mock_weasyprint_instance
             
@@ -563,57 +468,31 @@ class TestReportGenerator(unittest.TestCase):
             
             # 验证结果
             self.assertIsNotNone(report_file)
-            mock_load_template.assert_called()
-            mock_fill_template.assert_called()
+            self.assertGreater(self.generator._load_template_calls, 0)
+            self.assertGreater(self.generator._fill_template_calls, 0)
             mock_weasyprint.assert_called()
             mock_weasyprint_instance.write_pdf.assert_called()
     
-    def test_generate_executive_summary(self):
-        """测试生成执行摘要"""
-        # 生成执行摘要
-        summary = self.generator._generate_executive_summary(self.analysis_data)
-        
-        # 验证结果
-        self.assertIsInstance(summary, str)
-        self.assertGreater(len(summary), 0)
-    
-    def test_generate_device_performance_section(self):
-        """测试生成设备性能部分"""
-        # 生成设备性能部分
-        section = self.generator._generate_device_performance_section(self.analysis_data["device_performance"])
-        
-        # 验证结果
-        self.assertIsInstance(section, str)
-        self.assertGreater(len(section), 0)
-    
-    def test_generate_security_analysis_section(self):
-        """测试生成安全分析部分"""
-        # 生成安全分析部分
-        section = self.generator._generate_security_analysis_section(self.analysis_data["security_threats"])
-        
-        # 验证结果
-        self.assertIsInstance(section, str)
-        self.assertGreater(len(section), 0)
-    
-    def test_generate_system_performance_section(self):
-        """测试生成系统性能部分"""
-        # 生成系统性能部分
-        section = self.generator._generate_system_performance_section(self.analysis_data["system_performance"])
-        
-        # 验证结果
-        self.assertIsInstance(section, str)
-        self.assertGreater(len(section), 0)
-    
-    def test_generate_recommendations(self):
-        """测试生成建议部分"""
-        # 生成建议部分
-        recommendations = self.generator._generate_recommendations(self.analysis_data)
-        
-        # 验证结果
-        self.assertIsInstance(recommendations, str)
-        self.assertGreater(len(recommendations), 0)
-
+    def test_generate_sections(self):
+        """测试生成执行摘要、各分析部分和建议部分"""
+        # (生成方法, 输入数据)
+        cases = [
+            ("_generate_executive_summary", self.analysis_data),
+            ("_generate_device_performance_section", self.analysis_data["device_performance"]),
+            ("_generate_security_analysis_section", self.analysis_data["security_threats"]),
+            ("_generate_system_performance_section", self.analysis_data["system_performance"]),
+            ("_generate_recommendations", self.analysis_data),
+        ]
+        
+        for method_name, data in cases:
+            with self.subTest(method=method_name):
+                section = getattr(self.generator, method_name)(data)
+                
+                # 验证结果
+                self.assertIsInstance(section, str)
+                self.assertGreater(len(section), 0)
 
+@unittest.skipUnless(os.environ.get("RUN_INTEGRATION") == "1", "长时间运行的集成测试，设置RUN_INTEGRATION=1启用")
 class TestIntegration(unittest.TestCase):
     """数据分析模块集成测试"""
     
@@ -659,7 +538,7 @@ class TestIntegration(unittest.TestCase):
         # 配置报告生成器
         generator_config = {
             "reports_dir": self.reports_dir,
-            "templates_dir": "../src/analytics/report_templates",
+            "templates_dir": TEMPLATES_DIR,
             "report_format": "html",
             "sections": [
                 "executive_summary",
@@ -673,65 +552,27 @@ class TestIntegration(unittest.TestCase):
         # 创建组件实例
         self.collector = DataCollector(collector_config)
         self.analyzer = StatisticalAnalyzer(analyzer_config)
-        self.generator = ReportGenerator(generator_config)
+        self.generator = _StubReportGenerator(generator_config)
     
     def tearDown(self):
         """在每个测试之后清理"""
-        # 删除临时目录中的所有文件和子目录
-        for root, dirs, files in os.walk(self.temp_dir, topdown=False):
-            for file in files:
-                os.remove(os.path.join(root, file))
-            for dir_name in dirs:
-                os.rmdir(os.path.join(root, dir_name))
-        os.rmdir(self.temp_dir)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
     
-    @unittest.skip("长时间运行的集成测试")
     def test_analytics_integration(self):
         """测试数据分析组件的集成"""
         # 1. 收集样本数据
+        base_ts = int(time.time() * 1000)
+        
         # 设备遥测数据
-        for i in range(10):
-            device_data = {
-                "device_id": "test-gateway",
-                "device_type": "gateway",
-                "timestamp": int(time.time() * 1000) - i * 60000,
-                "data": {
-                    "connected_devices": 5 + i,
-                    "data_throughput": 256.5 + i * 10,
-                    "cpu_usage": 15.2 + i * 0.5,
-                    "memory_usage": 256.7 + i * 5
-                }
-            }
+        for device_data in _load_samples("gateway_telemetry", base_ts).to_dict(orient="records"):
             self.collector.collect_device_data(device_data)
         
         # 安全威胁数据
-        for i in range(5):
-            security_data = {
-                "threat_id": f"threat-{i+1}",
-                "type": "ddos" if i % 2 == 0 else "mitm",
-                "confidence": 70 + i * 5,
-                "source": f"192.168.1.{100+i}",
-                "target": "192.168.1.1",
-                "timestamp": int(time.time() * 1000) - i * 600000,
-                "details": {
-                    "packet_count": 1000 * (i + 1),
-                    "duration": 10 * (i + 1)
-                }
-            }
+        for security_data in _load_samples("threat_logs", base_ts).to_dict(orient="records"):
             self.collector.collect_security_data(security_data)
         
         # 系统性能数据
-        for i in range(8):
-            performance_data = {
-                "timestamp": int(time.time() * 1000) - i * 300000,
-                "system": "edge-gateway",
-                "metrics": {
-                    "cpu_utilization": 20.0 + i * 2,
-                    "memory_usage": 400.0 + i * 25,
-                    "disk_usage": 1000.0 + i * 50,
-                    "network_throughput": 1000.0 + i * 100
-                }
-            }
+        for performance_data in _load_samples("system_metrics", base_ts).to_dict(orient="records"):
             self.collector.collect_performance_data(performance_data)
         
         # 2. 分析收集的数据
@@ -768,25 +609,17 @@ class TestIntegration(unittest.TestCase):
             "system_performance": system_performance
         }
         
-        # 使用模拟的模板生成和填充
-        with patch('src.analytics.report_generator.ReportGenerator._load_template') as mock_load_template, \
-             patch('src.analytics.report_generator.ReportGenerator._fill_template') as mock_fill_template:
-            
-            mock_load_template.return_value = "<html>{{ content }}</html>"
-            mock_fill_template.return_value = "<html>Report content</html>"
-            
-            # 生成报告
-            report_file = self.generator.generate_report(
-                title="边缘计算安全分析报告",
-                analysis_data=analysis_data,
-                visualization_files=["mock_visualization_1.png", "mock_visualization_2.png"]
-            )
-            
-            # 验证结果
-            self.assertIsNotNone(report_file)
-            mock_load_template.assert_called()
-            mock_fill_template.assert_called()
-
+        # 生成报告（使用固定模板）
+        report_file = self.generator.generate_report(
+            title="边缘计算安全分析报告",
+            analysis_data=analysis_data,
+            visualization_files=["mock_visualization_1.png", "mock_visualization_2.png"]
+        )
+        
+        # 验证结果
+        self.assertIsNotNone(report_file)
+        self.assertGreater(self.generator._load_template_calls, 0)
+        self.assertGreater(self.generator._fill_template_calls, 0)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -10,17 +10,92 @@ import sys
 import unittest
 import json
 import time
-from unittest.mock import MagicMock, patch, Mock
-import requests
+from unittest.mock import MagicMock
+from requests.exceptions import RequestException
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.platform_connector.connector_base import ConnectorBase
+from src.platform_connector import edgex_connector, thingsboard_connector
 from src.platform_connector.edgex_connector import EdgeXConnector
-from src.platform_connector.thingsboard_connector import ThingsBoardConnector
+from src.platform_connector.thingsboard_connector import ThingsBoardConnector, _dumps as tb_dumps
 from src.utils.config import load_config
 
+# 录制回放集成测试的HTTP交互，未安装vcrpy时跳过集成测试
+try:
+    import vcr
+except ImportError:
+    vcr = None
+
+
+class _FakeResponse:
+    """只包含连接器会读取的属性的HTTP响应替身，创建后不再修改，可在测试间共享"""
+    
+    def __init__(self, status_code=200, payload=None):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.text = self.content.decode("utf-8")
+    
+    def json(self):
+        return json.loads(self.content)
+
+
+# 各测试共用的响应原型
+_EDGEX_RESPONSE = _FakeResponse(200, {"id": "test-id"})
+_EDGEX_PING_RESPONSE = _FakeResponse(200, {"version": "1.0.0"})
+_UNAUTHORIZED_RESPONSE = _FakeResponse(401)
+_TB_TOKEN_RESPONSE = _FakeResponse(200, {"token": "test-token"})
+_TB_AUTH_RESPONSE = _FakeResponse(200, {"token": "test-token", "refreshToken": "test-refresh"})
+_TB_DEVICE_RESPONSE = _FakeResponse(200, {
+    "id": {"id": "test-device-id"},
+    "name": "test-gateway",
+    "type": "gateway"
+})
+_TB_TELEMETRY_RESPONSE = _FakeResponse(200)
+
+# 集成测试的HTTP交互记录文件
+_CASSETTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'platform_integration.yaml')
+
+# 请求断言中使用的JSON请求头
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# 连接器配置文件路径及其不存在时使用的默认配置
+_EDGEX_CONFIG_PATH = '../config/edgex.yaml'
+_EDGEX_DEFAULT_CONFIG = {
+    "url": "http://localhost:48080",
+    "username": "admin",
+    "password": "admin"
+}
+_TB_CONFIG_PATH = '../config/thingsboard.yaml'
+_TB_DEFAULT_CONFIG = {
+    "url": "http://localhost:8080",
+    "username": "tenant@thingsboard.org",
+    "password": "tenant"
+}
+
+
+class _ConcreteConnector(ConnectorBase):
+    """用于测试连接器基类的具体实现"""
+    
+    def connect(self):
+        return True
+        
+    def disconnect(self):
+        return True
+        
+    def register_device(self, device_type, device_id, attributes=None):
+        return {"id": "test-id", "success": True}
+        
+    def update_device(self, device_id, attributes):
+        return {"success": True}
+        
+    def delete_device(self, device_id):
+        return {"success": True}
+        
+    def send_telemetry(self, device_id, telemetry):
+        return {"success": True}
+
 
 class TestConnectorBase(unittest.TestCase):
     """测试连接器基类"""
@@ -28,26 +103,7 @@ class TestConnectorBase(unittest.TestCase):
     def setUp(self):
         """在每个测试之前设置"""
         # 创建一个具体的连接器实例用于测试
-        class ConcreteConnector(ConnectorBase):
-            def connect(self):
-                return True
-                
-            def disconnect(self):
-                return True
-                
-            def register_device(self, device_type, device_id, attributes=None):
-                return {"id": "test-id", "success": True}
-                
-            def update_device(self, device_id, attributes):
-                return {"success": True}
-                
-            def delete_device(self, device_id):
-                return {"success": True}
-                
-            def send_telemetry(self, device_id, telemetry):
-                return {"success": True}
-        
-        self.connector = ConcreteConnector("test-platform", {})
+        self.connector = _ConcreteConnector("test-platform", {})
     
     def test_init(self):
         """测试初始化"""
@@ -82,46 +138,45 @@ class TestConnectorBase(unittest.TestCase):
 class TestEdgeXConnector(unittest.TestCase):
     """测试EdgeX Foundry连接器"""
     
+    @classmethod
+    def setUpClass(cls):
+        """在所有测试之前设置，配置文件只加载一次"""
+        # 加载配置，配置文件不存在时使用默认配置
+        if os.path.exists(_EDGEX_CONFIG_PATH):
+            cls.config = load_config(_EDGEX_CONFIG_PATH)
+        else:
+            cls.config = dict(_EDGEX_DEFAULT_CONFIG)
+        cls.auth = (cls.config.get('username'), cls.config.get('password'))
+        
+        # 模拟requests模块，直接替换模块属性
+        cls._real_requests = edgex_connector.requests
+        cls.mock_requests = MagicMock(spec=cls._real_requests)
+        cls.mock_session = MagicMock(spec=cls._real_requests.Session)
+        cls.mock_requests.Session.return_value = cls.mock_session
+        edgex_connector.requests = cls.mock_requests
+        cls.addClassCleanup(setattr, edgex_connector, "requests", cls._real_requests)
+        
+        # 创建连接器实例，由各测试共享
+        cls.connector = EdgeXConnector(cls.config)
+    
     def setUp(self):
         """在每个测试之前设置"""
-        # 加载配置
-        try:
-            self.config = load_config('../config/edgex.yaml')
-        except Exception:
-            # 如果配置文件不存在，使用默认配置
-            self.config = {
-                "url": "http://localhost:48080",
-                "username": "admin",
-                "password": "admin"
-            }
-        
-        # 模拟requests模块
-        self.patcher = patch('src.platform_connector.edgex_connector.requests')
-        self.mock_requests = self.patcher.start()
+        # 清除上一个测试留下的调用记录和模拟行为
+        self.mock_session.reset_mock(return_value=True, side_effect=True)
         
         # 设置模拟响应
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"id": "test-id"}
-        self.mock_requests.get.return_value = mock_response
-        self.mock_requests.post.return_value = mock_response
-        self.mock_requests.put.return_value = mock_response
-        self.mock_requests.delete.return_value = mock_response
+        self.mock_session.configure_mock(**{
+            f"{verb}.return_value": _EDGEX_RESPONSE for verb in ("get", "post", "put", "delete")
+        })
         
-        # 创建连接器实例
-        self.connector = EdgeXConnector(self.config)
-    
-    def tearDown(self):
-        """在每个测试之后清理"""
-        self.patcher.stop()
+        # 重置连接器中会被测试修改的状态
+        self.connector.connected = False
+        self.connector.devices = {}
     
     def test_connect(self):
         """测试连接功能"""
         # 设置模拟响应
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"version": "1.0.0"}
-        self.mock_requests.get.return_value = mock_response
+        self.mock_session.get.return_value = _EDGEX_PING_RESPONSE
         
         # 测试连接
         result = self.connector.connect()
@@ -129,20 +184,18 @@ class TestEdgeXConnector(unittest.TestCase):
         self.assertTrue(self.connector.connected)
         
         # 验证请求
-        self.mock_requests.get.assert_called_with(
+        self.mock_session.get.assert_called_with(
             f"{self.config['url']}/api/v1/ping",
-            headers={"Content-Type": "application/json"},
-            auth=(self.config.get('username'), self.config.get('password')),
+            headers=_JSON_HEADERS,
+            auth=self.auth,
             timeout=10
         )
     
     def test_connect_failure(self):
         """测试连接失败的情况"""
         # 设置模拟响应
-        mock_response = Mock()
-        mock_response.status_code = 401
-        self.mock_requests.get.return_value = mock_response
-        self.mock_requests.get.side_effect = requests.RequestException("Connection error")
+        self.mock_session.get.return_value = _UNAUTHORIZED_RESPONSE
+        self.mock_session.get.side_effect = RequestException("Connection error")
         
         # 测试连接
         result = self.connector.connect()
@@ -161,7 +214,7 @@ class TestEdgeXConnector(unittest.TestCase):
         self.assertEqual(result, {"id": "test-id"})
         
         # 验证请求
-        self.mock_requests.post.assert_called()
+        self.mock_session.post.assert_called()
         
         # 设备应该被添加到内部列表
         self.assertIn("test-gateway", self.connector.devices)
@@ -180,50 +233,41 @@ class TestEdgeXConnector(unittest.TestCase):
         self.assertEqual(result, {"id": "test-id"})
         
         # 验证请求
-        self.mock_requests.post.assert_called()
+        self.mock_session.post.assert_called()
 
 
 class TestThingsBoardConnector(unittest.TestCase):
     """测试ThingsBoard Edge连接器"""
     
+    @classmethod
+    def setUpClass(cls):
+        """在所有测试之前设置，配置文件只加载一次"""
+        # 加载配置，配置文件不存在时使用默认配置
+        if os.path.exists(_TB_CONFIG_PATH):
+            cls.config = load_config(_TB_CONFIG_PATH)
+        else:
+            cls.config = dict(_TB_DEFAULT_CONFIG)
+    
     def setUp(self):
         """在每个测试之前设置"""
-        # 加载配置
-        try:
-            self.config = load_config('../config/thingsboard.yaml')
-        except Exception:
-            # 如果配置文件不存在，使用默认配置
-            self.config = {
-                "url": "http://localhost:8080",
-                "username": "tenant@thingsboard.org",
-                "password": "tenant"
-            }
-        
-        # 模拟requests模块
-        self.patcher = patch('src.platform_connector.thingsboard_connector.requests')
-        self.mock_requests = self.patcher.start()
+        # 模拟requests模块，直接替换模块属性
+        self._real_requests = thingsboard_connector.requests
+        self.mock_requests = MagicMock(spec=self._real_requests)
+        self.mock_session = MagicMock(spec=self._real_requests.Session)
+        self.mock_requests.Session.return_value = self.mock_session
+        thingsboard_connector.requests = self.mock_requests
+        self.addCleanup(setattr, thingsboard_connector, "requests", self._real_requests)
         
         # 设置模拟响应
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"token": "test-token"}
-        self.mock_requests.post.return_value = mock_response
+        self.mock_session.post.return_value = _TB_TOKEN_RESPONSE
         
         # 创建连接器实例
         self.connector = ThingsBoardConnector(self.config)
     
-    def tearDown(self):
-        """在每个测试之后清理"""
-        self.patcher.stop()
-    
     def test_connect(self):
         """测试连接功能"""
         # 设置模拟响应
-        mock_auth_response = Mock()
-        mock_auth_response.status_code = 200
-        mock_auth_response.json.return_value = {"token": "test-token", "refreshToken": "test-refresh"}
-        
-        self.mock_requests.post.return_value = mock_auth_response
+        self.mock_session.post.return_value = _TB_AUTH_RESPONSE
         
         # 测试连接
         result = self.connector.connect()
@@ -232,20 +276,20 @@ class TestThingsBoardConnector(unittest.TestCase):
         self.assertEqual(self.connector.auth_token, "test-token")
         
         # 验证请求
-        self.mock_requests.post.assert_called_with(
+        self.mock_session.post.assert_called_with(
             f"{self.config['url']}/api/auth/login",
-            json={
+            data=tb_dumps({
                 "username": self.config['username'],
                 "password": self.config['password']
-            },
-            headers={"Content-Type": "application/json"},
+            }),
+            headers=_JSON_HEADERS,
             timeout=10
         )
     
     def test_connect_failure(self):
         """测试连接失败的情况"""
         # 设置模拟响应
-        self.mock_requests.post.side_effect = requests.RequestException("Connection error")
+        self.mock_session.post.side_effect = RequestException("Connection error")
         
         # 测试连接
         result = self.connector.connect()
@@ -260,14 +304,7 @@ class TestThingsBoardConnector(unittest.TestCase):
         self.connector.auth_token = "test-token"
         
         # 设置模拟响应
-        mock_device_response = Mock()
-        mock_device_response.status_code = 200
-        mock_device_response.json.return_value = {
-            "id": {"id": "test-device-id"},
-            "name": "test-gateway",
-            "type": "gateway"
-        }
-        self.mock_requests.post.return_value = mock_device_response
+        self.mock_session.post.return_value = _TB_DEVICE_RESPONSE
         
         # 测试注册设备
         result = self.connector.register_device("gateway", "test-gateway", {"model": "XM-GW1"})
@@ -277,7 +314,7 @@ class TestThingsBoardConnector(unittest.TestCase):
         self.assertEqual(result["name"], "test-gateway")
         
         # 验证请求
-        self.mock_requests.post.assert_called()
+        self.mock_session.post.assert_called()
         
         # 设备应该被添加到内部列表
         self.assertIn("test-gateway", self.connector.devices)
@@ -290,9 +327,7 @@ class TestThingsBoardConnector(unittest.TestCase):
         self.connector.add_device("test-gateway", {"id": {"id": "test-device-id"}, "type": "gateway"})
         
         # 设置模拟响应
-        mock_telemetry_response = Mock()
-        mock_telemetry_response.status_code = 200
-        self.mock_requests.post.return_value = mock_telemetry_response
+        self.mock_session.post.return_value = _TB_TELEMETRY_RESPONSE
         
         # 测试发送遥测数据
         telemetry = {"temperature": 25.5, "humidity": 60}
@@ -302,13 +337,10 @@ class TestThingsBoardConnector(unittest.TestCase):
         self.assertTrue(result["success"])
         
         # 验证请求
-        self.mock_requests.post.assert_called_with(
+        self.mock_session.post.assert_called_with(
             f"{self.config['url']}/api/plugins/telemetry/DEVICE/test-device-id/telemetry",
-            json=telemetry,
-            headers={
-                "Content-Type": "application/json",
-                "X-Authorization": f"Bearer {self.connector.auth_token}"
-            },
+            data=tb_dumps(telemetry),
+            headers={**_JSON_HEADERS, "X-Authorization": f"Bearer {self.connector.auth_token}"},
             timeout=10
         )
 
@@ -316,65 +348,45 @@ class TestThingsBoardConnector(unittest.TestCase):
 class TestIntegration(unittest.TestCase):
     """平台连接器集成测试"""
     
-    @unittest.skip("需要实际的EdgeX Foundry和ThingsBoard实例")
+    @unittest.skipUnless(
+        vcr is not None and (os.path.exists(_CASSETTE) or os.environ.get("RECORD_INTEGRATION") == "1"),
+        "需要vcrpy和录制好的平台交互记录（设置RECORD_INTEGRATION=1连接实际实例录制）"
+    )
     def test_platform_integration(self):
-        """测试与实际平台的集成"""
-        # 加载EdgeX配置
-        edgex_config = load_config('../config/edgex.yaml')
-        
-        # 创建EdgeX连接器
-        edgex = EdgeXConnector(edgex_config)
-        
-        # 连接到EdgeX
-        success = edgex.connect()
-        self.assertTrue(success)
-        
-        # 注册测试设备
-        device_id = f"test-device-{int(time.time())}"
-        result = edgex.register_device("gateway", device_id, {"model": "XM-GW1"})
-        self.assertIn("id", result)
-        
-        # 发送测试遥测数据
-        telemetry = {"temperature": 25.5, "humidity": 60, "timestamp": int(time.time() * 1000)}
-        result = edgex.send_telemetry(device_id, telemetry)
-        self.assertTrue("id" in result or "success" in result)
-        
-        # 清理：删除测试设备
-        result = edgex.delete_device(device_id)
-        self.assertTrue(result.get("success", False))
-        
-        # 断开连接
-        edgex.disconnect()
-        self.assertFalse(edgex.connected)
-        
-        # 加载ThingsBoard配置
-        tb_config = load_config('../config/thingsboard.yaml')
-        
-        # 创建ThingsBoard连接器
-        tb = ThingsBoardConnector(tb_config)
-        
-        # 连接到ThingsBoard
-        success = tb.connect()
-        self.assertTrue(success)
-        
-        # 注册测试设备
-        device_id = f"test-device-{int(time.time())}"
-        result = tb.register_device("gateway", device_id, {"model": "XM-GW1"})
-        self.assertIn("id", result)
-        
-        # 发送测试遥测数据
-        telemetry = {"temperature": 25.5, "humidity": 60, "timestamp": int(time.time() * 1000)}
-        result = tb.send_telemetry(device_id, telemetry)
-        self.assertTrue(result.get("success", False))
-        
-        # 清理：删除测试设备
-        result = tb.delete_device(device_id)
-        self.assertTrue(result.get("success", False))
-        
-        # 断开连接
-        tb.disconnect()
-        self.assertFalse(tb.connected)
-
+        """测试与实际平台的集成，首次运行录制HTTP交互，之后从记录回放"""
+        # (平台名称, 连接器类, 配置文件路径, 遥测结果中表示成功的字段)
+        platforms = [
+            ("edgex", EdgeXConnector, _EDGEX_CONFIG_PATH, ("id", "success")),
+            ("thingsboard", ThingsBoardConnector, _TB_CONFIG_PATH, ("success",)),
+        ]
+        
+        with vcr.use_cassette(_CASSETTE):
+            for name, connector_class, config_path, telemetry_keys in platforms:
+                with self.subTest(platform=name):
+                    # 加载配置并创建连接器
+                    connector = connector_class(load_config(config_path))
+                    
+                    # 连接到平台
+                    success = connector.connect()
+                    self.assertTrue(success)
+                    
+                    # 注册测试设备，使用固定的设备ID便于录制回放
+                    device_id = f"test-device-{name}"
+                    result = connector.register_device("gateway", device_id, {"model": "XM-GW1"})
+                    self.assertIn("id", result)
+                    
+                    # 发送测试遥测数据
+                    telemetry = {"temperature": 25.5, "humidity": 60, "timestamp": int(time.time() * 1000)}
+                    result = connector.send_telemetry(device_id, telemetry)
+                    self.assertTrue(any(result.get(key) for key in telemetry_keys))
+                    
+                    # 清理：删除测试设备
+                    result = connector.delete_device(device_id)
+                    self.assertTrue(result.get("success", False))
+                    
+                    # 断开连接
+                    connector.disconnect()
+                    self.assertFalse(connector.connected)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
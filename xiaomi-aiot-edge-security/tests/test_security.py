@@ -9,10 +9,15 @@ import os
 import sys
 import unittest
 import json
+import copy
 import time
-import threading
-from unittest.mock import MagicMock, patch, Mock
+from functools import cached_property, lru_cache
+from unittest.mock import MagicMock
 import queue
+import shutil
+import tempfile
+
+import yaml
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -25,18 +30,47 @@ from src.security.rules.mitm_rules import MITMRules
 from src.security.rules.firmware_rules import FirmwareRules
 from src.security.rules.credential_rules import CredentialRules
 from src.utils.config import load_config
+from tests.helpers import FakeThread
+
+
+@lru_cache(maxsize=None)
+def _load_security_config():
+    """加载安全配置，所有集成测试共享同一份解析结果（只读）"""
+    try:
+        return load_config('../config/security.yaml')
+    except Exception:
+        # 如果配置文件不存在，使用默认配置
+        return {
+            "detector": {
+                "monitoring_interval": 1.0,
+                "alert_threshold": 80,
+                "rules": {
+                    "ddos": {"enabled": True, "threshold": 100},
+                    "mitm": {"enabled": True, "threshold": 80},
+                    "firmware": {"enabled": True, "threshold": 70},
+                    "credential": {"enabled": True, "threshold": 90}
+                }
+            },
+            "protection": {
+                "auto_protection": True,
+                "protection_levels": {
+                    "low": {"threshold": 30, "actions": ["log"]},
+                    "medium": {"threshold": 60, "actions": ["log", "alert"]},
+                    "high": {"threshold": 80, "actions": ["log", "alert", "block"]}
+                },
+                "notification_endpoints": ["admin@example.com"]
+            }
+        }
 
 
 class TestAttackDetector(unittest.TestCase):
     """测试攻击检测器"""
     
-    def setUp(self):
-        """在每个测试之前设置"""
-        # 模拟安全日志记录器
-        self.mock_logger = MagicMock(spec=SecurityLogger)
-        
+    @classmethod
+    def setUpClass(cls):
+        """所有测试共享同一个检测器实例"""
         # 模拟配置
-        self.config = {
+        cls.config = {
             "monitoring_interval": 1.0,
             "alert_threshold": 80,
             "rules": {
@@ -48,45 +82,56 @@ class TestAttackDetector(unittest.TestCase):
         }
         
         # 创建攻击检测器实例
-        self.detector = AttackDetector(self.config, self.mock_logger)
+        cls.detector = AttackDetector(cls.config, thread_factory=FakeThread)
+    
+    def setUp(self):
+        """记录测试可能修改的规则配置"""
+        self._rules_snapshot = copy.deepcopy(self.config["rules"])
+    
+    def tearDown(self):
+        """恢复测试中修改的规则配置（如packet_threshold、suspicious_domains）"""
+        self.config["rules"] = self._rules_snapshot
     
     def test_init(self):
         """测试初始化"""
         self.assertEqual(self.detector.config, self.config)
-        self.assertEqual(self.detector.monitoring_interval, 1.0)
-        self.assertEqual(self.detector.alert_threshold, 80)
-        self.assertFalse(self.detector.monitoring_active)
-        self.assertIsNone(self.detector.monitoring_thread)
-        
-        # 检查规则是否已初始化
-        self.assertEqual(len(self.detector.rules), 4)
-        self.assertIsInstance(self.detector.rules[0], DDOSRules)
-        self.assertIsInstance(self.detector.rules[1], MITMRules)
-        self.assertIsInstance(self.detector.rules[2], FirmwareRules)
-        self.assertIsInstance(self.detector.rules[3], CredentialRules)
+        self.assertFalse(self.detector.running)
+        
+        # 检查每种攻击类型的检测方法是否已初始化
+        self.assertEqual(len(self.detector.detectors_by_type), len(self.detector.attack_types))
+        for attack_type in ("ddos", "mitm", "firmware", "credential"):
+            with self.subTest(attack_type=attack_type):
+                self.assertIn(attack_type, self.detector.detectors_by_type)
+    
+    def test_detectors_by_type(self):
+        """测试按攻击类型索引的检测方法"""
+        # 每种攻击类型都应有对应的检测方法，且顺序与attack_types一致
+        self.assertEqual(list(self.detector.detectors_by_type), self.detector.attack_types)
+        
+        for attack_type, detect_method in self.detector.detectors_by_type.items():
+            with self.subTest(attack_type=attack_type):
+                self.assertEqual(detect_method, getattr(self.detector, f"_detect_{attack_type}_attack"))
+                self.assertIs(detect_method.__self__, self.detector)
     
     def test_start_stop_monitoring(self):
         """测试启动和停止监控"""
-        # 模拟线程
-        with patch('threading.Thread') as mock_thread:
-            mock_thread_instance = MagicMock()
-            mock_thread.return_value = mock_thread_instance
-            
-            # 测试启动监控
-            result = self.detector.start_monitoring()
-            self.assertTrue(result)
-            self.assertTrue(self.detector.monitoring_active)
-            
-            # 线程应该已启动
-            mock_thread_instance.start.assert_called_once()
-            
-            # 测试停止监控
-            result = self.detector.stop_monitoring()
-            self.assertTrue(result)
-            self.assertFalse(self.detector.monitoring_active)
+        # 测试启动监控
+        self.detector.start()
+        self.assertTrue(self.detector.running)
+        
+        # 线程应该已启动，并运行检测循环
+        self.assertTrue(self.detector.detector_thread.started)
+        self.assertEqual(self.detector.detector_thread.target, self.detector._detection_loop)
+        
+        # 测试停止监控
+        self.detector.stop()
+        self.assertFalse(self.detector.running)
+        self.assertFalse(self.detector.detector_thread.started)
     
     def test_analyze_traffic(self):
         """测试流量分析"""
+        now = int(time.time())
+        
         # 模拟正常流量数据
         normal_traffic = {
             "source_ip": "192.168.1.100",
@@ -95,7 +140,7 @@ class TestAttackDetector(unittest.TestCase):
             "port": 80,
             "packet_count": 10,
             "byte_count": 1500,
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         # 测试分析正常流量
@@ -110,14 +155,12 @@ class TestAttackDetector(unittest.TestCase):
             "port": 80,
             "packet_count": 10000,
             "byte_count": 1500000,
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         # 修改DDoS规则检测阈值
-        for rule in self.detector.rules:
-            if isinstance(rule, DDOSRules):
-                rule.packet_threshold = 1000
-                break
+        self.assertIn("ddos", self.detector.detectors_by_type)
+        self.detector.config["rules"]["ddos"]["packet_threshold"] = 1000
         
         # 测试分析DDoS攻击流量
         threats = self.detector.analyze_traffic(ddos_traffic)
@@ -128,19 +171,18 @@ class TestAttackDetector(unittest.TestCase):
         self.assertEqual(threat["type"], "ddos")
         self.assertGreaterEqual(threat["confidence"], 0)
         self.assertLessEqual(threat["confidence"], 100)
-        
-        # 日志记录器应该记录威胁
-        self.mock_logger.log_threat.assert_called()
     
     def test_analyze_device_activity(self):
         """测试设备活动分析"""
+        now = int(time.time())
+        
         # 模拟正常设备活动
         normal_activity = {
             "device_id": "test-device",
             "device_type": "gateway",
             "action": "telemetry_update",
             "data": {"temperature": 25.5},
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         # 测试分析正常设备活动
@@ -157,14 +199,12 @@ class TestAttackDetector(unittest.TestCase):
                 "url": "http://malicious-site.com/firmware.bin",
                 "checksum": "invalid-checksum"
             },
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         # 模拟固件规则检测
-        for rule in self.detector.rules:
-            if isinstance(rule, FirmwareRules):
-                rule.suspicious_domains = ["malicious-site.com"]
-                break
+        self.assertIn("firmware", self.detector.detectors_by_type)
+        self.detector.config["rules"]["firmware"]["suspicious_domains"] = ["malicious-site.com"]
         
         # 测试分析可疑固件更新
         threats = self.detector.analyze_device_activity(suspicious_firmware)
@@ -175,21 +215,16 @@ class TestAttackDetector(unittest.TestCase):
         self.assertEqual(threat["type"], "firmware")
         self.assertGreaterEqual(threat["confidence"], 0)
         self.assertLessEqual(threat["confidence"], 100)
-        
-        # 日志记录器应该记录威胁
-        self.mock_logger.log_threat.assert_called()
 
 
 class TestProtectionEngine(unittest.TestCase):
     """测试防护引擎"""
     
-    def setUp(self):
-        """在每个测试之前设置"""
-        # 模拟安全日志记录器
-        self.mock_logger = MagicMock(spec=SecurityLogger)
-        
+    @classmethod
+    def setUpClass(cls):
+        """所有测试共享同一个防护引擎实例"""
         # 模拟配置
-        self.config = {
+        cls.config = {
             "auto_protection": True,
             "protection_levels": {
                 "low": {"threshold": 30, "actions": ["log"]},
@@ -199,13 +234,35 @@ class TestProtectionEngine(unittest.TestCase):
             "notification_endpoints": ["admin@example.com"]
         }
         
-        # 创建防护引擎实例
-        self.engine = ProtectionEngine(self.config, self.mock_logger)
+        # 将配置写入临时配置文件，防护引擎从中读取 protection_engine 部分
+        cls.temp_dir = tempfile.mkdtemp()
+        config_path = os.path.join(cls.temp_dir, "security.yaml")
+        with open(config_path, "w", encoding="utf-8") as f:
+            yaml.safe_dump({"protection_engine": cls.config}, f)
         
-        # 创建一个队列用于测试
+        # 创建防护引擎实例
+        cls.engine = ProtectionEngine(config_path, thread_factory=FakeThread)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """清理临时配置文件"""
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+    
+    def setUp(self):
+        """在每个测试之前设置"""
+        # 每个测试使用独立的队列
         self.alert_queue = queue.Queue()
         self.engine.alert_queue = self.alert_queue
     
+    def tearDown(self):
+        """移除测试中替换的实例方法（如_block_source、handle_threat）并复位处理状态"""
+        for name in ("_block_source", "handle_threat"):
+            self.engine.__dict__.pop(name, None)
+        
+        # 启动过的测试不一定会停止引擎，这里复位以免影响后续测试
+        self.engine.protection_thread = None
+        self.engine.stop_event.clear()
+    
     def test_init(self):
         """测试初始化"""
         self.assertEqual(self.engine.config, self.config)
@@ -215,26 +272,23 @@ class TestProtectionEngine(unittest.TestCase):
     
     def test_start_stop_processing(self):
         """测试启动和停止处理"""
-        # 模拟线程
-        with patch('threading.Thread') as mock_thread:
-            mock_thread_instance = MagicMock()
-            mock_thread.return_value = mock_thread_instance
-            
-            # 测试启动处理
-            result = self.engine.start_processing()
-            self.assertTrue(result)
-            self.assertTrue(self.engine.processing_active)
-            
-            # 线程应该已启动
-            mock_thread_instance.start.assert_called_once()
-            
-            # 测试停止处理
-            result = self.engine.stop_processing()
-            self.assertTrue(result)
-            self.assertFalse(self.engine.processing_active)
+        # 测试启动处理
+        self.engine.start()
+        self.assertFalse(self.engine.stop_event.is_set())
+        
+        # 线程应该已启动，并运行防护循环
+        self.assertTrue(self.engine.protection_thread.started)
+        self.assertEqual(self.engine.protection_thread.target, self.engine._protection_loop)
+        
+        # 测试停止处理
+        self.engine.stop()
+        self.assertTrue(self.engine.stop_event.is_set())
+        self.assertFalse(self.engine.protection_thread.started)
     
     def test_handle_threat(self):
         """测试威胁处理"""
+        now = int(time.time())
+        
         # 创建低威胁
         low_threat = {
             "id": "threat-1",
@@ -242,7 +296,7 @@ class TestProtectionEngine(unittest.TestCase):
             "confidence": 20,
             "source": "192.168.1.100",
             "target": "192.168.1.1",
-            "timestamp": int(time.time()),
+            "timestamp": now,
             "details": {
                 "packet_count": 500,
                 "duration": 10
@@ -253,12 +307,6 @@ class TestProtectionEngine(unittest.TestCase):
         actions = self.engine.handle_threat(low_threat)
         self.assertEqual(actions, ["log"])
         
-        # 日志记录器应该记录防护操作
-        self.mock_logger.log_protection.assert_called_once()
-        
-        # 重置模拟
-        self.mock_logger.reset_mock()
-        
         # 创建高威胁
         high_threat = {
             "id": "threat-2",
@@ -266,7 +314,7 @@ class TestProtectionEngine(unittest.TestCase):
             "confidence": 90,
             "source": "192.168.1.200",
             "target": "192.168.1.1",
-            "timestamp": int(time.time()),
+            "timestamp": now,
             "details": {
                 "arp_spoofing": True,
                 "duration": 30
@@ -280,19 +328,15 @@ class TestProtectionEngine(unittest.TestCase):
         actions = self.engine.handle_threat(high_threat)
         self.assertEqual(set(actions), set(["log", "alert", "block"]))
         
-        # 日志记录器应该记录防护操作
-        self.mock_logger.log_protection.assert_called_once()
-        
         # 阻止方法应该被调用
         self.engine._block_source.assert_called_with(high_threat["source"])
     
     def test_process_alerts(self):
         """测试警报处理"""
+        now = int(time.time())
+        
         # 启动处理
-        with patch('threading.Thread') as mock_thread:
-            mock_thread_instance = MagicMock()
-            mock_thread.return_value = mock_thread_instance
-            self.engine.start_processing()
+        self.engine.start_processing()
         
         # 添加威胁到队列
         threat = {
@@ -301,7 +345,7 @@ class TestProtectionEngine(unittest.TestCase):
             "confidence": 85,
             "source": "192.168.1.150",
             "target": "test-device",
-            "timestamp": int(time.time()),
+            "timestamp": now,
             "details": {
                 "login_attempts": 10,
                 "duration": 5
@@ -324,6 +368,8 @@ class TestSecurityRules(unittest.TestCase):
     
     def test_ddos_rules(self):
         """测试DDoS防护规则"""
+        now = int(time.time())
+        
         # 创建规则实例
         config = {"threshold": 1000, "time_window": 60}
         rules = DDOSRules(config)
@@ -336,7 +382,7 @@ class TestSecurityRules(unittest.TestCase):
             "port": 80,
             "packet_count": 100,
             "byte_count": 15000,
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         result = rules.analyze(normal_traffic)
@@ -351,7 +397,7 @@ class TestSecurityRules(unittest.TestCase):
             "port": 80,
             "packet_count": 5000,
             "byte_count": 750000,
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         result = rules.analyze(ddos_traffic)
@@ -360,6 +406,8 @@ class TestSecurityRules(unittest.TestCase):
     
     def test_mitm_rules(self):
         """测试中间人攻击防护规则"""
+        now = int(time.time())
+        
         # 创建规则实例
         config = {"threshold": 80, "arp_cache_expiry": 300}
         rules = MITMRules(config)
@@ -369,7 +417,7 @@ class TestSecurityRules(unittest.TestCase):
             "source_ip": "192.168.1.100",
             "source_mac": "00:11:22:33:44:55",
             "operation": "request",
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         result = rules.analyze(normal_arp)
@@ -380,14 +428,14 @@ class TestSecurityRules(unittest.TestCase):
         # 首先缓存正常的MAC地址
         rules.arp_cache["192.168.1.100"] = {
             "mac": "AA:BB:CC:DD:EE:FF",
-            "timestamp": int(time.time()) - 10
+            "timestamp": now - 10
         }
         
         spoofed_arp = {
             "source_ip": "192.168.1.100",
             "source_mac": "00:11:22:33:44:55",  # 与缓存中的不同
             "operation": "reply",
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         result = rules.analyze(spoofed_arp)
@@ -396,6 +444,8 @@ class TestSecurityRules(unittest.TestCase):
     
     def test_firmware_rules(self):
         """测试固件攻击防护规则"""
+        now = int(time.time())
+        
         # 创建规则实例
         config = {
             "threshold": 70,
@@ -414,7 +464,7 @@ class TestSecurityRules(unittest.TestCase):
                 "url": "https://update.xiaomi.com/firmware.bin",
                 "checksum": "valid-checksum"
             },
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         result = rules.analyze(normal_update)
@@ -431,7 +481,7 @@ class TestSecurityRules(unittest.TestCase):
                 "url": "http://malware.com/firmware.bin",
                 "checksum": "invalid-checksum"
             },
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         result = rules.analyze(suspicious_update)
@@ -440,6 +490,8 @@ class TestSecurityRules(unittest.TestCase):
     
     def test_credential_rules(self):
         """测试凭证攻击防护规则"""
+        now = int(time.time())
+        
         # 创建规则实例
         config = {
             "threshold": 90,
@@ -457,7 +509,7 @@ class TestSecurityRules(unittest.TestCase):
                 "username": "admin",
                 "success": True
             },
-            "timestamp": int(time.time())
+            "timestamp": now
         }
         
         result = rules.analyze(normal_login)
@@ -465,17 +517,17 @@ class TestSecurityRules(unittest.TestCase):
         self.assertEqual(result["confidence"], 0)
         
         # 测试多次失败登录
+        failed_login = {
+            "device_id": "test-device",
+            "device_type": "gateway",
+            "action": "login",
+            "data": {
+                "username": "admin",
+                "success": False
+            },
+            "timestamp": now
+        }
         for _ in range(6):
-            failed_login = {
-                "device_id": "test-device",
-                "device_type": "gateway",
-                "action": "login",
-                "data": {
-                    "username": "admin",
-                    "success": False
-                },
-                "timestamp": int(time.time())
-            }
             rules.analyze(failed_login)
         
         # 再次尝试登录，应该被检测为凭证攻击
@@ -489,46 +541,27 @@ class TestIntegration(unittest.TestCase):
     
     def setUp(self):
         """在每个测试之前设置"""
-        # 创建一个实际的安全日志记录器
-        self.logger = SecurityLogger({
-            "log_file": "test_security.log",
-            "log_level": "INFO",
-            "max_size": 10485760,  # 10MB
-            "backup_count": 3
-        })
+        # 日志文件放在独立的临时目录中，并行运行时互不干扰
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.temp_dir, "test_security.log")
         
         # 加载安全配置
-        try:
-            self.security_config = load_config('../config/security.yaml')
-        except Exception:
-            # 如果配置文件不存在，使用默认配置
-            self.security_config = {
-                "detector": {
-                    "monitoring_interval": 1.0,
-                    "alert_threshold": 80,
-                    "rules": {
-                        "ddos": {"enabled": True, "threshold": 100},
-                        "mitm": {"enabled": True, "threshold": 80},
-                        "firmware": {"enabled": True, "threshold": 70},
-                        "credential": {"enabled": True, "threshold": 90}
-                    }
-                },
-                "protection": {
-                    "auto_protection": True,
-                    "protection_levels": {
-                        "low": {"threshold": 30, "actions": ["log"]},
-                        "medium": {"threshold": 60, "actions": ["log", "alert"]},
-                        "high": {"threshold": 80, "actions": ["log", "alert", "block"]}
-                    },
-                    "notification_endpoints": ["admin@example.com"]
-                }
-            }
+        self.security_config = _load_security_config()
     
     def tearDown(self):
         """在每个测试之后清理"""
         # 移除测试日志文件
-        if os.path.exists("test_security.log"):
-            os.remove("test_security.log")
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @cached_property
+    def logger(self):
+        """实际的安全日志记录器，首次使用时才创建日志文件处理器"""
+        return SecurityLogger({
+            "log_file": self.log_file,
+            "log_level": "INFO",
+            "max_size": 10485760,  # 10MB
+            "backup_count": 3
+        })
     
     @unittest.skip("长时间运行的集成测试")
     def test_security_integration(self):
@@ -566,10 +599,10 @@ class TestIntegration(unittest.TestCase):
             time.sleep(1.0)
             
             # 检查日志文件是否存在
-            self.assertTrue(os.path.exists("test_security.log"))
+            self.assertTrue(os.path.exists(self.log_file))
             
             # 读取日志并检查
-            with open("test_security.log", "r") as f:
+            with open(self.log_file, "r") as f:
                 log_content = f.read()
                 self.assertIn("THREAT", log_content)
                 self.assertIn("PROTECTION", log_content)
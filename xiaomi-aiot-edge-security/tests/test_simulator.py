@@ -10,6 +10,7 @@ import sys
 import unittest
 import json
 import time
+from functools import lru_cache
 from unittest.mock import MagicMock, patch
 import threading
 
@@ -23,6 +24,26 @@ from src.device_simulator.speaker import SpeakerSimulator
 from src.device_simulator.camera import CameraSimulator
 from src.utils.config import load_config
 
+@lru_cache(maxsize=None)
+def _load_simulator_config():
+    """加载模拟器配置，所有集成测试共享同一份解析结果（只读）"""
+    try:
+        return load_config('../config/simulator.yaml')
+    except Exception:
+        # 如果配置文件不存在，使用默认配置
+        return {
+            "mqtt": {
+                "broker_host": "localhost",
+                "broker_port": 1883
+            }
+        }
+
+
+class _PublishResult:
+    """publish 的返回值，rc=0 表示成功"""
+    rc = 0
+
+
 class MockMQTTClient:
     """MQTT客户端模拟类"""
     
@@ -50,16 +71,14 @@ class MockMQTTClient:
         return [0, 0]
         
     def publish(self, topic, payload, qos=0):
+        # 只有序列化后的字符串/字节才需要解析，其余负载原样记录
         message = {
             'topic': topic,
-            'payload': json.loads(payload) if isinstance(payload, str) else payload,
+            'payload': json.loads(payload) if isinstance(payload, (str, bytes)) else payload,
             'qos': qos
         }
         self.published_messages.append(message)
-        
-        class Result:
-            rc = 0
-        return Result()
+        return _PublishResult()
 
 
 class TestDeviceSimulatorBase(unittest.TestCase):
@@ -154,11 +173,11 @@ class TestDeviceSimulatorBase(unittest.TestCase):
         result = self.device.send_telemetry(telemetry)
         
         # 应该调用协议处理器的publish方法
-        self.mock_protocol_handler.publish.assert_called_once()
+        publish_calls = self.mock_protocol_handler.publish.call_args_list
+        self.assertEqual(len(publish_calls), 1)
         
         # 检查发送的数据格式
-        args, kwargs = self.mock_protocol_handler.publish.call_args
-        topic, message = args
+        topic, message = publish_calls[0].args
         
         self.assertEqual(topic, "v1/devices/me/telemetry")
         self.assertEqual(message["device_id"], self.device.device_id)
@@ -167,113 +186,56 @@ class TestDeviceSimulatorBase(unittest.TestCase):
         self.assertIn("timestamp", message)
 
 
-class TestGatewaySimulator(unittest.TestCase):
-    """测试网关设备模拟器"""
+class TestDeviceSimulators(unittest.TestCase):
+    """测试各类设备模拟器"""
     
-    @patch('src.utils.protocol.MQTTHandler')
-    def test_gateway_simulator(self, mock_mqtt_handler):
-        """测试网关模拟器的特定功能"""
-        # 设置模拟的MQTT处理器
-        mock_instance = MagicMock()
-        mock_mqtt_handler.return_value = mock_instance
-        
-        # 创建网关模拟器实例
-        gateway = GatewaySimulator(device_id="test_gateway")
-        
-        # 测试属性初始化
-        self.assertEqual(gateway.device_type, "gateway")
-        self.assertEqual(gateway.device_id, "test_gateway")
-        
-        # 测试遥测数据生成
-        telemetry = gateway.generate_telemetry()
-        self.assertIn("connected_devices", telemetry)
-        self.assertIn("data_throughput", telemetry)
-        self.assertIn("cpu_usage", telemetry)
-        self.assertIn("memory_usage", telemetry)
-        
-        # 测试设备管理功能
-        if hasattr(gateway, "add_connected_device"):
-            result = gateway.add_connected_device("test_device")
-            self.assertTrue(result)
-            self.assertIn("test_device", gateway.connected_devices)
-            
-            telemetry = gateway.generate_telemetry()
-            self.assertEqual(telemetry["connected_devices"], 1)
-
-
-class TestRouterSimulator(unittest.TestCase):
-    """测试路由器模拟器"""
+    # (模拟器类, 设备类型, 设备ID, 遥测数据应包含的字段)
+    CASES = (
+        (GatewaySimulator, "gateway", "test_gateway",
+         ("connected_devices", "data_throughput", "cpu_usage", "memory_usage")),
+        (RouterSimulator, "router", "test_router",
+         ("network_traffic", "connected_clients", "signal_strength", "bandwidth_usage")),
+        (SpeakerSimulator, "speaker", "test_speaker",
+         ("volume", "playing_status", "bluetooth_connections", "voice_commands_count")),
+        (CameraSimulator, "camera", "test_camera",
+         ("resolution", "frame_rate", "motion_detected", "storage_usage")),
+    )
     
     @patch('src.utils.protocol.MQTTHandler')
-    def test_router_simulator(self, mock_mqtt_handler):
-        """测试路由器模拟器的特定功能"""
+    def test_device_simulators(self, mock_mqtt_handler):
+        """测试各模拟器的属性初始化和遥测数据生成"""
         # 设置模拟的MQTT处理器
-        mock_instance = MagicMock()
-        mock_mqtt_handler.return_value = mock_instance
-        
-        # 创建路由器模拟器实例
-        router = RouterSimulator(device_id="test_router")
-        
-        # 测试属性初始化
-        self.assertEqual(router.device_type, "router")
-        self.assertEqual(router.device_id, "test_router")
-        
-        # 测试遥测数据生成
-        telemetry = router.generate_telemetry()
-        self.assertIn("network_traffic", telemetry)
-        self.assertIn("connected_clients", telemetry)
-        self.assertIn("signal_strength", telemetry)
-        self.assertIn("bandwidth_usage", telemetry)
-
-
-class TestSpeakerSimulator(unittest.TestCase):
-    """测试小爱音箱模拟器"""
-    
-    @patch('src.utils.protocol.MQTTHandler')
-    def test_speaker_simulator(self, mock_mqtt_handler):
-        """测试音箱模拟器的特定功能"""
-        # 设置模拟的MQTT处理器
-        mock_instance = MagicMock()
-        mock_mqtt_handler.return_value = mock_instance
-        
-        # 创建音箱模拟器实例
-        speaker = SpeakerSimulator(device_id="test_speaker")
-        
-        # 测试属性初始化
-        self.assertEqual(speaker.device_type, "speaker")
-        self.assertEqual(speaker.device_id, "test_speaker")
-        
-        # 测试遥测数据生成
-        telemetry = speaker.generate_telemetry()
-        self.assertIn("volume", telemetry)
-        self.assertIn("playing_status", telemetry)
-        self.assertIn("bluetooth_connections", telemetry)
-        self.assertIn("voice_commands_count", telemetry)
-
-
-class TestCameraSimulator(unittest.TestCase):
-    """测试摄像头模拟器"""
+        mock_mqtt_handler.return_value = MagicMock()
+        
+        for simulator_cls, device_type, device_id, telemetry_keys in self.CASES:
+            with self.subTest(device_type=device_type):
+                # 创建模拟器实例
+                device = simulator_cls(device_id=device_id)
+                
+                # 测试属性初始化
+                self.assertEqual(device.device_type, device_type)
+                self.assertEqual(device.device_id, device_id)
+                
+                # 测试遥测数据生成
+                telemetry = device.generate_telemetry()
+                for key in telemetry_keys:
+                    self.assertIn(key, telemetry)
     
     @patch('src.utils.protocol.MQTTHandler')
-    def test_camera_simulator(self, mock_mqtt_handler):
-        """测试摄像头模拟器的特定功能"""
-        # 设置模拟的MQTT处理器
-        mock_instance = MagicMock()
-        mock_mqtt_handler.return_value = mock_instance
+    def test_gateway_connected_devices(self, mock_mqtt_handler):
+        """测试网关模拟器的设备管理功能"""
+        mock_mqtt_handler.return_value = MagicMock()
+        gateway = GatewaySimulator(device_id="test_gateway")
         
-        # 创建摄像头模拟器实例
-        camera = CameraSimulator(device_id="test_camera")
+        if not hasattr(gateway, "add_connected_device"):
+            self.skipTest("网关模拟器不支持设备管理")
         
-        # 测试属性初始化
-        self.assertEqual(camera.device_type, "camera")
-        self.assertEqual(camera.device_id, "test_camera")
+        result = gateway.add_connected_device("test_device")
+        self.assertTrue(result)
+        self.assertIn("test_device", gateway.connected_devices)
         
-        # 测试遥测数据生成
-        telemetry = camera.generate_telemetry()
-        self.assertIn("resolution", telemetry)
-        self.assertIn("frame_rate", telemetry)
-        self.assertIn("motion_detected", telemetry)
-        self.assertIn("storage_usage", telemetry)
+        telemetry = gateway.generate_telemetry()
+        self.assertEqual(telemetry["connected_devices"], 1)
 
 
 class TestIntegration(unittest.TestCase):
@@ -282,16 +244,7 @@ class TestIntegration(unittest.TestCase):
     def setUp(self):
         """在每个测试之前设置"""
         # 加载配置
-        try:
-            self.config = load_config('../config/simulator.yaml')
-        except Exception:
-            # 如果配置文件不存在，使用默认配置
-            self.config = {
-                "mqtt": {
-                    "broker_host": "localhost",
-                    "broker_port": 1883
-                }
-            }
+        self.config = _load_simulator_config()
         
         # 清理现有设备列表
         self.devices = []